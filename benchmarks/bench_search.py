@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmark - Replays a fixed query corpus against core.search,
+core.search_stack, core.search_stacks and design_system.generate_design_system.
+
+Usage: python bench_search.py [--repeat 5] [--cold-runs 3] [--scale 10] [--json]
+
+Reports:
+  - index build time per dataset (CSV load + validation, full build, one-row incremental edit)
+  - cold latency (fresh interpreter: startup + import + first call) p50/p95/p99
+  - warm latency (in-process, after one warm-up pass, ranking LRU cleared per call) p50/p95/p99
+  - cached latency (the same calls served from the ranking LRU) p50/p95/p99
+  - queries/sec over the warm runs and peak RSS
+
+--scale N replays the same corpus against a synthetic copy of data/ with N x
+the row count (see scale_data.py), to catch BM25 scaling regressions.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "skills" / "coding" / "ui-ux-pro-max" / "scripts"
+DEFAULT_CORPUS = BENCH_DIR / "queries.json"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import core  # noqa: E402
+import design_system  # noqa: E402
+from compiler import CACHE_ENV  # noqa: E402
+from scale_data import scale_data  # noqa: E402
+
+KINDS = ["search", "stack", "stacks", "design_system"]
+
+
+# ============ STATS ============
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(rss / divisor, 1)
+
+
+# ============ CORPUS ============
+def load_corpus(path):
+    """Load the query corpus JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_calls(corpus):
+    """Yield (kind, label, callable) for every query in the corpus"""
+    for domain, queries in corpus.get("domains", {}).items():
+        for query in queries:
+            yield "search", f"{domain}:{query}", lambda q=query, d=domain: core.search(q, d)
+    for stack in core.AVAILABLE_STACKS:
+        for query in corpus.get("stacks", []):
+            yield "stack", f"{stack}:{query}", lambda q=query, s=stack: core.search_stack(q, s)
+    for query in corpus.get("stacks", []):
+        yield "stacks", f"all:{query}", lambda q=query: core.search_stacks(q, "all")
+    for query in corpus.get("design_system", []):
+        yield "design_system", query, lambda q=query: design_system.generate_design_system(q)
+
+
+def use_data_dir(data_dir):
+    """Point core and design_system at another data/ tree"""
+    data_dir = Path(data_dir)
+    core.DATA_DIR = data_dir
+    design_system.DATA_DIR = data_dir
+
+
+# ============ BENCHMARKS ============
+dataset_configs = core.dataset_configs
+
+
+def bench_index_build():
+    """Time CSV load + validation, full index build and a one-row incremental edit per dataset"""
+    builds = {}
+    for name, config in dataset_configs():
+        filepath = core.DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        start = time.perf_counter()
+        data, _ = core.compile_csv(filepath, config)
+        loaded = time.perf_counter()
+        docs = core._row_docs(data, config["search_cols"])
+        index = core.SearchIndex(filter_cols=config.get("filter_cols", ()), output_cols=config["output_cols"])
+        index.sync(docs)
+        built = time.perf_counter()
+
+        # Edit the middle row in place and re-sync
+        edited = list(docs)
+        if edited:
+            key, text, row, _ = edited[len(edited) // 2]
+            edited[len(edited) // 2] = (key, text + " edited", row, "edited")
+        edit_start = time.perf_counter()
+        index.sync(edited)
+        done = time.perf_counter()
+
+        builds[name] = {
+            "rows": len(data),
+            "load_ms": round((loaded - start) * 1000, 3),
+            "fit_ms": round((built - loaded) * 1000, 3),
+            "edit_ms": round((done - edit_start) * 1000, 3),
+        }
+    return builds
+
+
+def _clear_ranked_caches():
+    """Drop every loaded index's ranking LRU, so the next call scores again"""
+    for _, index in core._INDEX_CACHE.values():
+        index._ranked_cache.clear()
+
+
+def bench_warm(calls, repeat):
+    """In-process latency after one warm-up pass.
+
+    "latency" clears the ranking LRU before every call (outside the timer),
+    so it measures scoring; "cached" replays the same calls as LRU hits.
+    """
+    for _, _, fn in calls:
+        fn()
+
+    samples = {kind: [] for kind in KINDS}
+    cached = {kind: [] for kind in KINDS}
+    total = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for kind, _, fn in calls:
+            _clear_ranked_caches()
+            t0 = time.perf_counter()
+            fn()
+            sample = time.perf_counter() - t0
+            samples[kind].append(sample)
+            elapsed += sample
+            total += 1
+            t0 = time.perf_counter()
+            fn()
+            cached[kind].append(time.perf_counter() - t0)
+
+    return {
+        "latency": {kind: summarize(s) for kind, s in samples.items() if s},
+        "cached": {kind: summarize(s) for kind, s in cached.items() if s},
+        "queries": total,
+        "queries_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _cold_child(kind, label, data_dir):
+    """Run one cold call in a fresh interpreter, returns wall seconds"""
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", kind, label]
+    if data_dir:
+        cmd += ["--data-dir", str(data_dir)]
+    start = time.perf_counter()
+    subprocess.check_call(cmd, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_cold(calls, runs, data_dir=None):
+    """Fresh-process latency (startup + import + first call) per kind"""
+    by_kind = {kind: [label for k, label, _ in calls if k == kind] for kind in KINDS}
+    samples = {kind: [] for kind in KINDS}
+    for kind, labels in by_kind.items():
+        for i in range(min(runs, len(labels)) if labels else 0):
+            samples[kind].append(_cold_child(kind, labels[i * len(labels) // runs], data_dir))
+    return {kind: summarize(s) for kind, s in samples.items() if s}
+
+
+def run_child(kind, label):
+    """Entry point for --child: a single first call in a fresh process"""
+    if kind == "search":
+        domain, query = label.split(":", 1)
+        core.search(query, domain)
+    elif kind == "stack":
+        stack, query = label.split(":", 1)
+        core.search_stack(query, stack)
+    elif kind == "stacks":
+        core.search_stacks(label.split(":", 1)[1], "all")
+    else:
+        design_system.generate_design_system(label)
+
+
+# ============ REPORTING ============
+def format_report(report):
+    """Human-readable benchmark report"""
+    lines = [f"## UI Pro Max Benchmark (scale: {report['scale']}x)"]
+
+    lines.append("\n### Index build")
+    lines.append(f"{'dataset':<24} {'rows':>8} {'load ms':>10} {'fit ms':>10} {'edit ms':>10}")
+    for name, b in report["index_build"].items():
+        lines.append(f"{name:<24} {b['rows']:>8} {b['load_ms']:>10.2f} {b['fit_ms']:>10.2f} {b['edit_ms']:>10.2f}")
+
+    sections = [("Cold", report["cold"]), ("Warm", report["warm"]["latency"]),
+                ("Cached (ranking LRU hit)", report["warm"].get("cached"))]
+    for title, latency in sections:
+        if not latency:
+            continue
+        lines.append(f"\n### {title} latency")
+        lines.append(f"{'kind':<16} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+        for kind, s in latency.items():
+            lines.append(f"{kind:<16} {s['count']:>6} {s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f} {s['p99_ms']:>10.2f}")
+
+    lines.append("")
+    lines.append(f"**Throughput:** {report['warm']['queries_per_sec']} queries/sec ({report['warm']['queries']} warm queries)")
+    lines.append(f"**Peak RSS:** {report['peak_rss_mb']} MB")
+    return "\n".join(lines)
+
+
+def run(corpus_path=DEFAULT_CORPUS, repeat=5, cold_runs=3, scale=1):
+    """Run the full benchmark and return the report dict"""
+    corpus = load_corpus(corpus_path)
+    tmp = None
+    data_dir = None
+    saved_cache = os.environ.get(CACHE_ENV)
+    if scale > 1:
+        tmp = tempfile.TemporaryDirectory(prefix="uipro-bench-")
+        data_dir = Path(tmp.name)
+        scale_data(scale, data_dir)
+        use_data_dir(data_dir)
+        # Compiled indexes of the scaled copy live and die with it (children inherit the variable)
+        os.environ[CACHE_ENV] = str(data_dir / "cache")
+
+    try:
+        calls = list(iter_calls(corpus))
+        report = {
+            "scale": scale,
+            "index_build": bench_index_build(),
+            "cold": bench_cold(calls, cold_runs, data_dir) if cold_runs > 0 else {},
+            "warm": bench_warm(calls, repeat),
+        }
+        report["peak_rss_mb"] = peak_rss_mb()
+        return report
+    finally:
+        if tmp is not None:
+            if saved_cache is None:
+                os.environ.pop(CACHE_ENV, None)
+            else:
+                os.environ[CACHE_ENV] = saved_cache
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Benchmark")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Query corpus JSON (default: queries.json)")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Warm passes over the corpus (default: 5)")
+    parser.add_argument("--cold-runs", type=int, default=3, help="Fresh-process samples per kind (default: 3, 0 to skip)")
+    parser.add_argument("--scale", type=int, default=1, help="Synthetic row multiplier, e.g. 10 or 100 (default: 1)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "LABEL"), help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        if args.data_dir:
+            use_data_dir(args.data_dir)
+        run_child(*args.child)
+        sys.exit(0)
+
+    report = run(args.corpus, args.repeat, args.cold_runs, args.scale)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(report))
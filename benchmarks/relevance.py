@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Relevance Regression - Compares scorer backends against golden
+top-k rankings so performance work cannot silently change search results.
+
+Usage: python relevance.py [--backend core] [--k 10] [--json]
+       python relevance.py --update          # regenerate golden/rankings.json
+
+Goldens are produced by the reference backend (core.BM25, pure Python) over the
+queries in queries.json and stored as ordered row ids ("No" column) per dataset.
+Every other backend must reproduce them exactly; the report lists Kendall tau,
+top-k overlap and the exact differences for every query that drifted.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from bench_search import DEFAULT_CORPUS, core, dataset_configs, load_corpus
+import shards  # noqa: E402
+
+GOLDEN_FILE = Path(__file__).resolve().parent / "golden" / "rankings.json"
+DEFAULT_K = 10
+
+
+# ============ BACKENDS ============
+def row_id(row, idx):
+    """Stable row identifier: the "No" column, falling back to row position"""
+    return row.get("No") or str(idx)
+
+
+def rank_reference(filepath, config, query, k):
+    """Reference ranking: fresh pure-Python BM25 over the whole CSV"""
+    data = core._load_csv(filepath)
+    documents = [" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in data]
+    bm25 = core.BM25()
+    bm25.fit(documents)
+    return [row_id(data[idx], idx) for idx, score in bm25.score(query)[:k] if score > 0]
+
+
+def rank_core(filepath, config, query, k):
+    """Ranking produced by the code path behind core.search"""
+    index, ranked = core._rank_csv(filepath, config, query, k)
+    return [row_id(index.rows[doc_id], index.positions[doc_id]) for doc_id, _ in ranked]
+
+
+def rank_sharded(filepath, config, query, k):
+    """core ranking forced through the multi-process shard workers"""
+    min_docs = core.SHARD_MIN_DOCS
+    core.SHARD_MIN_DOCS = 0
+    os.environ.setdefault(shards.WORKERS_ENV, "4")
+    try:
+        index = core._get_index(filepath, config)
+        ranking, _ = index.ranked(index.tokenize(query), None, k)
+        return [row_id(index.rows[doc_id], index.positions[doc_id]) for doc_id, _ in ranking[:k]]
+    finally:
+        core.SHARD_MIN_DOCS = min_docs
+
+
+BACKENDS = {
+    "reference": rank_reference,
+    "core": rank_core,
+    "sharded": rank_sharded,
+}
+
+
+# ============ COMPARISON ============
+def kendall_tau(expected, actual):
+    """Kendall tau over the items both rankings share (1.0 = same order)"""
+    common = [item for item in expected if item in actual]
+    if len(common) < 2:
+        return 1.0 if expected == actual else 0.0
+    position = {item: i for i, item in enumerate(actual)}
+    concordant = discordant = 0
+    for i in range(len(common)):
+        for j in range(i + 1, len(common)):
+            if position[common[i]] < position[common[j]]:
+                concordant += 1
+            else:
+                discordant += 1
+    return (concordant - discordant) / (concordant + discordant)
+
+
+def overlap(expected, actual):
+    """Fraction of the golden top-k present in the actual top-k"""
+    if not expected and not actual:
+        return 1.0
+    return len(set(expected) & set(actual)) / max(len(expected), len(actual))
+
+
+def golden_queries(corpus):
+    """Map dataset name -> queries to rank, from the benchmark corpus"""
+    design_queries = corpus.get("design_system", [])
+    queries = {}
+    for name, _ in dataset_configs():
+        if name.startswith("stack:"):
+            queries[name] = list(corpus.get("stacks", []))
+        else:
+            queries[name] = list(corpus.get("domains", {}).get(name, [])) + design_queries
+    return queries
+
+
+def build_rankings(backend, queries, k):
+    """Rank every (dataset, query) with a backend"""
+    rank = BACKENDS[backend]
+    rankings = {}
+    for name, config in dataset_configs():
+        filepath = core.DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        rankings[name] = {q: rank(filepath, config, q, k) for q in queries.get(name, [])}
+    return rankings
+
+
+def compare(golden, rankings):
+    """Compare rankings against goldens, returns per-dataset summary and diffs"""
+    summary = {}
+    diffs = []
+    for name, expected_by_query in golden.items():
+        actual_by_query = rankings.get(name, {})
+        taus = []
+        overlaps = []
+        exact = 0
+        for query, expected in expected_by_query.items():
+            actual = actual_by_query.get(query, [])
+            taus.append(kendall_tau(expected, actual))
+            overlaps.append(overlap(expected, actual))
+            if actual == expected:
+                exact += 1
+            else:
+                diffs.append({
+                    "dataset": name,
+                    "query": query,
+                    "expected": expected,
+                    "actual": actual,
+                    "missing": [i for i in expected if i not in actual],
+                    "unexpected": [i for i in actual if i not in expected],
+                })
+        count = len(expected_by_query)
+        summary[name] = {
+            "queries": count,
+            "exact": exact,
+            "mean_tau": round(sum(taus) / count, 4) if count else 1.0,
+            "mean_overlap": round(sum(overlaps) / count, 4) if count else 1.0,
+        }
+    return summary, diffs
+
+
+def format_golden(golden):
+    """Serialize goldens with one ranking per line, for readable diffs"""
+    lines = ["{", f'  "k": {golden["k"]},', '  "rankings": {']
+    datasets = list(golden["rankings"].items())
+    for i, (name, by_query) in enumerate(datasets):
+        lines.append(f"    {json.dumps(name)}: {{")
+        items = list(by_query.items())
+        for j, (query, ids) in enumerate(items):
+            comma = "," if j < len(items) - 1 else ""
+            lines.append(f"      {json.dumps(query, ensure_ascii=False)}: {json.dumps(ids)}{comma}")
+        lines.append("    }" + ("," if i < len(datasets) - 1 else ""))
+    lines.append("  }")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def format_report(backend, summary, diffs):
+    """Human-readable relevance report"""
+    lines = [f"## Relevance vs golden rankings (backend: {backend})"]
+    lines.append(f"{'dataset':<24} {'queries':>8} {'exact':>6} {'tau':>8} {'overlap':>8}")
+    for name, s in summary.items():
+        lines.append(f"{name:<24} {s['queries']:>8} {s['exact']:>6} {s['mean_tau']:>8.3f} {s['mean_overlap']:>8.3f}")
+
+    if diffs:
+        lines.append(f"\n### {len(diffs)} ranking differences")
+        for d in diffs:
+            lines.append(f"- **{d['dataset']}** \"{d['query']}\"")
+            lines.append(f"    expected: {', '.join(d['expected'])}")
+            lines.append(f"    actual:   {', '.join(d['actual'])}")
+    else:
+        lines.append("\nAll rankings match the goldens.")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Relevance Regression")
+    parser.add_argument("--backend", "-b", choices=list(BACKENDS.keys()), default="core", help="Scorer backend to check (default: core)")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help=f"Top-k depth when updating goldens (default: {DEFAULT_K})")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Query corpus JSON (default: queries.json)")
+    parser.add_argument("--golden", default=str(GOLDEN_FILE), help="Golden rankings file")
+    parser.add_argument("--update", action="store_true", help="Regenerate goldens from the reference backend")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    golden_path = Path(args.golden)
+    queries = golden_queries(load_corpus(args.corpus))
+
+    if args.update:
+        golden = {"k": args.k, "rankings": build_rankings("reference", queries, args.k)}
+        golden_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(golden_path, 'w', encoding='utf-8') as f:
+            f.write(format_golden(golden))
+        print(f"Wrote {sum(len(q) for q in golden['rankings'].values())} golden rankings to {golden_path}")
+        sys.exit(0)
+
+    with open(golden_path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+
+    rankings = build_rankings(args.backend, queries, golden["k"])
+    summary, diffs = compare(golden["rankings"], rankings)
+
+    if args.json:
+        print(json.dumps({"backend": args.backend, "summary": summary, "diffs": diffs}, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(args.backend, summary, diffs))
+    sys.exit(1 if diffs else 0)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic data scaler - Multiplies the ui-ux-pro-max datasets by a fixed factor
+so BM25 fit/score scaling limits can be measured on realistic vocabularies.
+
+Usage: python scale_data.py <factor> <output_dir> [--seed 42]
+
+Every CSV under data/ (including stacks/) is written to <output_dir> with
+factor x the original row count. Copy 0 is the original data; later copies
+shuffle the words of each cell with the same column of another row, so term
+statistics stay close to the real corpus instead of duplicating documents.
+"""
+
+import argparse
+import csv
+import random
+import shutil
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent / "skills" / "coding" / "ui-ux-pro-max"
+SOURCE_DATA_DIR = SKILL_DIR / "data"
+
+
+def _mix_cell(value, donor, rng):
+    """Blend words of a cell with the same cell of a donor row"""
+    words = value.split()
+    donor_words = donor.split()
+    if not words:
+        return donor
+    keep = max(1, len(words) // 2)
+    mixed = rng.sample(words, keep) + rng.sample(donor_words, min(len(donor_words), len(words) - keep))
+    rng.shuffle(mixed)
+    return " ".join(mixed)
+
+
+def scale_csv(src, dest, factor, rng):
+    """Write a scaled copy of a single CSV file"""
+    with open(src, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with open(dest, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        number = 0
+        for copy in range(factor):
+            for row in rows:
+                number += 1
+                if copy == 0:
+                    out = dict(row)
+                else:
+                    donor = rng.choice(rows)
+                    out = {col: _mix_cell(row[col] or "", donor[col] or "", rng) for col in fieldnames}
+                if "No" in out:
+                    out["No"] = str(number)
+                writer.writerow(out)
+    return len(rows) * factor
+
+
+def scale_data(factor, output_dir, seed=42, source_dir=SOURCE_DATA_DIR):
+    """Scale every dataset into output_dir, returns {relative_path: row_count}"""
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    counts = {}
+    for src in sorted(source_dir.rglob("*.csv")):
+        rel = src.relative_to(source_dir)
+        if rel.name == "ui-reasoning.csv":
+            # Reasoning rules are looked up by category, not searched - keep as-is
+            (output_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, output_dir / rel)
+            continue
+        counts[str(rel)] = scale_csv(src, output_dir / rel, factor, rng)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scale ui-ux-pro-max datasets")
+    parser.add_argument("factor", type=int, help="Row count multiplier (e.g. 10, 100)")
+    parser.add_argument("output_dir", help="Directory to write the scaled data/ tree into")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    counts = scale_data(args.factor, args.output_dir, args.seed)
+    for rel, count in counts.items():
+        print(f"{rel}: {count} rows")
@@ -4,22 +4,35 @@
 # Core Foundry - Skills 终极同步工具
 # 功能：
 # 1. 自动检测环境 (Mac/Linux/WSL)
-# 2. 物理复制模式同步技能到各 IDE
+# 2. 物理复制模式同步技能到各 IDE (增量：仅复制变更文件；
+#    reflink 部署，不支持时回退为复制；CF_SYNC_LINK=1 时硬链接到内容寻址存储)
 # 3. 自动安装 Shell 别名 (cf-sync)
 # 4. 记忆用户偏好（IDE & Skill 选择）
 # 5. Git 远程更新检查
+# 6. --watch 监听技能改动并实时增量同步到上次的目标
+# 7. 非交互模式 (--ide/--skills/--projects-from/--yes/--json/--dry-run)
 # =================================================================
 
+import argparse
+import errno
 import glob
+import hashlib
 import json
 import logging
 import os
 import re
+import select
 import shutil
+import stat
+import struct
 import subprocess
 import sys
-from dataclasses import dataclass, field
-from typing import List, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Tuple
 
 
 # --- Colors & Icons ---
@@ -49,6 +62,23 @@ class Prefs:
     lastSkillIndexes: List[int] = field(default_factory=list)
     cachedIdeTargets: List[List[str]] = field(default_factory=list)  # [[name, path], ...]
     cachedProjects: List[str] = field(default_factory=list)
+    lastProjects: List[str] = field(default_factory=list)  # projects synced in Antigravity project mode
+    scanDepth: int = 2  # project discovery depth below each search root
+    scanSkipDirs: List[str] = field(default_factory=list)  # extra directory names to skip when scanning
+    lastUpdateCheck: float = 0.0  # time of the last background git fetch
+    updateAvailable: bool = False  # result of the last finished update check
+
+
+@dataclass
+class SyncResult:
+    target: str
+    path: str = ""
+    updated: List[str] = field(default_factory=list)  # skills with added/changed/removed files
+    skipped: List[str] = field(default_factory=list)  # skills already up to date
+    errors: List[str] = field(default_factory=list)
+    files_copied: int = 0
+    bytes_copied: int = 0
+    files_removed: int = 0
 
 
 # --- Constants & Paths ---
@@ -56,99 +86,173 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(SCRIPT_DIR)
 SKILLS_SRC = os.path.join(REPO_ROOT, "skills")
 PREF_FILE = os.path.expanduser("~/.config/core_foundry_prefs.json")
+# Project discovery: directories containing any marker are projects
+PROJECT_MARKERS = frozenset({
+    ".git", "package.json", "pom.xml", "build.gradle",
+    "requirements.txt", "go.mod", "Cargo.toml",
+    "vite.config.ts", "next.config.js", "pyproject.toml",
+})
+SCAN_SKIP_DIRS = frozenset({
+    "Library", "System", "Users", "Applications", "public", "private",
+    "node_modules", ".git", "dist", "build", "__pycache__", "venv", ".venv",
+})
+SCAN_DEPTH = 2
+PROJECT_INDEX_FILE = os.path.expanduser("~/.cache/core-foundry/project-index.json")
+MANIFEST_NAME = ".cf-sync-manifest.json"  # per-target record of synced files
+SYNC_WORKERS_ENV = "CF_SYNC_WORKERS"  # parallel target syncs (default: 2x CPUs, max 16)
+STORE_DIR = os.path.expanduser("~/.cache/core-foundry/objects")  # content-addressed file store
+SYNC_LINK_ENV = "CF_SYNC_LINK"  # "1": hardlink read-only store objects instead of writable copies
+STORE_GRACE = 3600  # seconds an unlinked store object is kept (a concurrent sync may be about to link it)
+FICLONE = 0x40049409  # Linux reflink ioctl (btrfs, XFS)
+WATCH_DEBOUNCE = 0.3  # seconds without new events before a burst of edits is synced
+WATCH_POLL_INTERVAL = 1.0  # seconds between scans when inotify is unavailable
+
+# Exit codes (headless mode)
+EXIT_OK = 0
+EXIT_ERRORS = 1  # some targets or skills failed
+EXIT_USAGE = 2  # bad arguments, unknown IDE/skill, missing --yes
+HEADLESS_FLAGS = {"--ide", "--skills", "--projects-from", "--yes", "-y", "--json", "--dry-run", "-h", "--help"}
+SYNC_IGNORE = {"__pycache__", ".DS_Store"}
+CATALOG_NAME = ".skills-index.json"  # skill catalog cached in SKILLS_SRC
+UPDATE_CHECK_INTERVAL = 6 * 3600  # seconds between remote update checks
+UPDATE_CHECK_TIMEOUT = 15  # seconds before a hanging git fetch is killed
+UPDATE_REPORT_WAIT = 0.5  # seconds the end of a run waits for an unfinished check
+
+
+def _list_dir(path: str, skip_dirs: Iterable[str]) -> Tuple[set, List[str]]:
+    """One scandir: (entry names, paths of visible subdirectories not in skip_dirs)."""
+    names = set()
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                names.add(entry.name)
+                if entry.name.startswith(".") or entry.name in skip_dirs:
+                    continue
+                try:
+                    if entry.is_dir():
+                        subdirs.append(os.path.realpath(entry.path) if entry.is_symlink() else entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return names, subdirs
 
 
-def find_projects(search_roots: List[str], cached_projects: List[str] = None) -> Tuple[List[str], bool]:
+def _visit(path: str, skip_dirs: Iterable[str], old: Dict[str, list], new: Dict[str, list]) -> Tuple[bool, List[str]]:
     """
-    Finds potential projects in multiple directory roots with caching.
-    Scans up to 2 levels deep to catch nested project structures.
-    Returns: (project_paths, is_from_cache)
+    (is_project, subdirectories) of one directory. Reuses the previous scan's
+    record when the directory's mtime is unchanged (entries added, removed
+    or renamed in it always bump it), otherwise lists it again.
     """
-    # 1. Try Cache
-    if cached_projects:
-        valid_cache = []
-        all_valid = True
-        for p in cached_projects:
-            real_path = os.path.realpath(p)
-            if os.path.exists(real_path) and os.path.isdir(real_path):
-                valid_cache.append(real_path)
-            else:
-                all_valid = False
-        
-        if valid_cache and all_valid:
-            # Deduplicate
-            valid_cache = sorted(list(set(valid_cache)))
-            print(f"{Colors.GREEN}{Icons.OK} 使用缓存的项目列表 ({len(valid_cache)} 个){Colors.NC}")
-            return valid_cache, True
-        elif valid_cache:
-             print(f"{Colors.YELLOW}{Icons.WARN} 缓存的项目路径部分无效，重新扫描...{Colors.NC}")
-    
-    # 2. Scan
-    # 2. Scan
-    projects = []
-    seen = set()
-    
-    # 排除自身 (Core Foundry) - 避免把自己识别为目标项目
-    seen.add(os.path.realpath(REPO_ROOT).lower())
-    
-    # Add cached projects to the set first (keep known valid ones)
-    if cached_projects:
-        for p in cached_projects:
-            real_path = os.path.realpath(p)
-            if os.path.exists(real_path) and os.path.isdir(real_path):
-                lower_path = real_path.lower()
-                if lower_path not in seen:
-                    projects.append(real_path)
-                    seen.add(lower_path)
-
-    # Directories to skip
-    skip_dirs = {"Library", "System", "Users", "Applications", "public", "private", 
-                 "node_modules", ".git", "dist", "build", "__pycache__", "venv", ".venv"}
-    
-    # Project markers
-    markers = [
-        ".git", "package.json", "pom.xml", "build.gradle", 
-        "requirements.txt", "go.mod", "Cargo.toml", 
-        "vite.config.ts", "next.config.js", "pyproject.toml"
-    ]
-
-    def is_project(path: str) -> bool:
-        """Check if a directory is a project."""
-        for marker in markers:
-            if os.path.exists(os.path.join(path, marker)):
-                return True
-        return False
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return False, []  # vanished: not carried into the new index
+    record = old.get(path)
+    if record and record[0] == mtime:
+        is_project, subdirs = record[1], record[2]
+    else:
+        names, subdirs = _list_dir(path, skip_dirs)
+        is_project = not PROJECT_MARKERS.isdisjoint(names)
+    new[path] = [mtime, is_project, [] if is_project else subdirs]
+    return is_project, subdirs
+
+
+def _scan_tree(path: str, depth: int, max_depth: int, skip_dirs: Iterable[str],
+               old: Dict[str, list], new: Dict[str, list]) -> List[str]:
+    """Projects at or below path; path itself sits at depth (root children are depth 1)."""
+    is_project, subdirs = _visit(path, skip_dirs, old, new)
+    if is_project:
+        return [path]
+    found = []
+    if depth < max_depth:
+        for sub in subdirs:
+            found.extend(_scan_tree(sub, depth + 1, max_depth, skip_dirs, old, new))
+    return found
+
+
+def scan_projects(
+    roots: List[str],
+    max_depth: int = SCAN_DEPTH,
+    skip_dirs: Iterable[str] = SCAN_SKIP_DIRS,
+    index: Dict[str, list] = None,
+) -> List[str]:
+    """
+    Finds project directories (any PROJECT_MARKERS entry) up to max_depth
+    below each root. Every directory is listed once and markers are checked
+    against its entry names; subtrees are scanned in parallel.
+    index (directory -> [mtime_ns, is_project, subdirs]) from a previous
+    scan lets unchanged directories skip the listing; it is replaced in place
+    with the directories seen by this scan, so vanished ones are pruned.
+    """
+    skip_dirs = frozenset(skip_dirs)
+    old = dict(index or {})
+    new = {}
+    top = [sub for root in roots for sub in _visit(root, skip_dirs, old, new)[1]]
+    found = []
+    if top and max_depth >= 1:
+        with ThreadPoolExecutor(max_workers=min(32, len(top))) as pool:
+            for projects in pool.map(lambda sub: _scan_tree(sub, 1, max_depth, skip_dirs, old, new), top):
+                found.extend(projects)
+    if index is not None:
+        index.clear()
+        index.update(new)
+    return found
+
+
+def load_project_index(max_depth: int, skip_dirs: Iterable[str], seed_projects: List[str] = None) -> dict:
+    """
+    The saved project index. Its directory records are dropped if it was
+    built with other scan settings; without an index file (first run after
+    upgrading) seed_projects, the legacy project cache, stands in for the
+    previous scan's results so they are pruned like scanned ones.
+    """
+    settings = [max_depth, sorted(skip_dirs)]
+    try:
+        with open(PROJECT_INDEX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == 1:
+            if data.get("settings") != settings:
+                data.update(settings=settings, dirs={})
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": 1, "settings": settings, "dirs": {}, "projects": list(seed_projects or [])}
 
-    def scan_directory(base_dir: str, current_depth: int, max_depth: int):
-        """Recursively scan directories up to max_depth."""
-        if current_depth > max_depth:
-            return
-        
-        if not os.path.exists(base_dir):
-            return
-            
-        try:
-            with os.scandir(base_dir) as entries:
-                for entry in entries:
-                    if not entry.is_dir() or entry.name.startswith('.'):
-                        continue
-                    if entry.name in skip_dirs:
-                        continue
 
-                    real_path = os.path.realpath(entry.path)
-                    
-                    if is_project(real_path):
-                        lower_path = real_path.lower()
-                        if lower_path not in seen:
-                            projects.append(real_path)
-                            seen.add(lower_path)
-                    elif current_depth < max_depth:
-                        # Not a project, but scan deeper
-                        scan_directory(real_path, current_depth + 1, max_depth)
-        except PermissionError:
-            pass
-        except Exception:
-            pass
+def save_project_index(data: dict):
+    try:
+        os.makedirs(os.path.dirname(PROJECT_INDEX_FILE), exist_ok=True)
+        tmp = f"{PROJECT_INDEX_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, PROJECT_INDEX_FILE)
+    except OSError as e:
+        logging.warning(f"保存项目索引失败: {e}")
+
+
+def find_projects(
+    search_roots: List[str],
+    cached_projects: List[str] = None,
+    max_depth: int = SCAN_DEPTH,
+    skip_dirs: Iterable[str] = SCAN_SKIP_DIRS,
+    full_rescan: bool = False,
+) -> Tuple[List[str], bool]:
+    """
+    Finds potential projects in multiple directory roots, up to max_depth
+    levels deep (default 2) to catch nested project structures.
+    A persistent directory index (PROJECT_INDEX_FILE) makes rescans
+    incremental: only directories whose mtime changed are listed again,
+    new projects are merged in and vanished ones pruned. Paths in
+    cached_projects that the scan never produced (manual adds) are kept
+    while they exist.
+    Returns: (project_paths, is_from_cache) - is_from_cache means nothing changed
+    """
+    skip_dirs = frozenset(skip_dirs)
+    data = load_project_index(max_depth, skip_dirs, cached_projects)
+    if full_rescan:
+        data["dirs"] = {}
 
     # Deduplicate search_roots as well
     normalized_roots = []
@@ -161,45 +265,121 @@ def find_projects(search_roots: List[str], cached_projects: List[str] = None) ->
         if lower_root not in seen_roots:
             normalized_roots.append(real_root)
             seen_roots.add(lower_root)
-            
-    for base_dir in normalized_roots:
-        print(f"{Colors.BLUE}{Icons.FIND} 正在扫描项目 (Base: {base_dir}, 深度: 2)...{Colors.NC}")
-        scan_directory(base_dir, 1, 2)  # Scan up to 2 levels deep
 
-    return sorted(list(projects)), False
+    mode = "全量" if not data["dirs"] else "增量"
+    print(f"{Colors.BLUE}{Icons.FIND} 正在{mode}扫描项目 ({len(normalized_roots)} 个目录, 深度: {max_depth})...{Colors.NC}")
+    scanned = scan_projects(normalized_roots, max_depth, skip_dirs, data["dirs"])
 
+    projects = []
+    seen = set()
+    # 排除自身 (Core Foundry) - 避免把自己识别为目标项目
+    seen.add(os.path.realpath(REPO_ROOT).lower())
 
-def check_git_status():
-    """Checks for remote updates."""
-    print(f"{Colors.BLUE}{Icons.FIND} 检查远程更新...{Colors.NC}")
+    # Manually added paths: in the cache but not from the previous scan
+    previous = set(os.path.realpath(p) for p in data["projects"])
+    manual = [p for p in (cached_projects or []) if os.path.realpath(p) not in previous]
+    for p in scanned + manual:
+        real_path = os.path.realpath(p)
+        lower_path = real_path.lower()
+        if lower_path not in seen and os.path.isdir(real_path):
+            projects.append(real_path)
+            seen.add(lower_path)
+
+    data["projects"] = scanned
+    save_project_index(data)
+
+    projects.sort()
+    old = sorted(set(os.path.realpath(p) for p in (cached_projects or [])))
+    if projects == old:
+        print(f"{Colors.GREEN}{Icons.OK} 项目列表无变化 ({len(projects)} 个){Colors.NC}")
+        return projects, True
+    added = len(set(projects) - set(old))
+    removed = len(set(old) - set(projects))
+    print(f"{Colors.GREEN}{Icons.OK} 共 {len(projects)} 个项目 (新增 {added}, 移除 {removed}){Colors.NC}")
+    return projects, False
+
+
+def check_git_status(fetch: bool = True) -> bool:
+    """
+    Checks for remote updates. The fetch is killed after UPDATE_CHECK_TIMEOUT
+    and never prompts for credentials; without fetch only local refs are compared.
+    Returns: True if the local branch differs from its upstream
+    """
     try:
-        # Fetch remote silently
-        subprocess.run(
-            ["git", "fetch", "--quiet", "origin", "main"],
-            cwd=REPO_ROOT,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        if fetch:
+            # Fetch remote silently
+            subprocess.run(
+                ["git", "fetch", "--quiet", "origin", "main"],
+                cwd=REPO_ROOT,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env=dict(os.environ, GIT_TERMINAL_PROMPT="0"),
+                timeout=UPDATE_CHECK_TIMEOUT,
+            )
 
         local = (
-            subprocess.check_output(["git", "rev-parse", "@"], cwd=REPO_ROOT)
+            subprocess.check_output(["git", "rev-parse", "@"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
             .strip()
             .decode("utf-8")
         )
 
         remote = (
-            subprocess.check_output(["git", "rev-parse", "@{u}"], cwd=REPO_ROOT)
+            subprocess.check_output(["git", "rev-parse", "@{u}"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
             .strip()
             .decode("utf-8")
         )
 
-        if local != remote and remote:
+        return bool(remote) and local != remote
+    except Exception:
+        # Ignore git errors (e.g. not a git repo, no network, fetch timed out)
+        return False
+
+
+def start_update_check(prefs: Prefs) -> Callable[[], None]:
+    """
+    Runs check_git_status in a background thread so the sync starts at once.
+    git fetch runs at most once per UPDATE_CHECK_INTERVAL (prefs.lastUpdateCheck,
+    persisted with the next save_prefs); other runs only compare local refs.
+    Returns: a function that waits briefly for the check, records a finished
+    result in prefs.updateAvailable and prints the latest known result, so a
+    slow check is reported on the next run instead of delaying this one
+    """
+    fetch = time.time() - prefs.lastUpdateCheck >= UPDATE_CHECK_INTERVAL
+    if fetch:
+        prefs.lastUpdateCheck = time.time()
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(check_git_status(fetch)), daemon=True)
+    thread.start()
+
+    def report():
+        thread.join(UPDATE_REPORT_WAIT)
+        if outcome:
+            prefs.updateAvailable = outcome[0]
+        if prefs.updateAvailable:
             print(
-                f"{Colors.YELLOW}{Icons.WARN} 注意：云端有新的技能更新，建议同步前执行 'cd {REPO_ROOT} && git pull'{Colors.NC}"
+                f"{Colors.YELLOW}{Icons.WARN} 注意：云端有新的技能更新，建议执行 'cd {REPO_ROOT} && git pull' 后重新同步{Colors.NC}"
             )
-    except Exception:
-        # Ignore git errors (e.g. not a git repo, no network)
-        pass
+
+    return report
+
+
+def known_ides() -> Dict[str, Tuple[str, str, str]]:
+    """IDE id (as used by --ide) -> (display name, skills dir, IDE config dir)."""
+    home = os.path.expanduser("~")
+    return {
+        "antigravity": (
+            "Antigravity Global (⚠️ 可能不生效 - 慎用)",
+            os.path.join(home, ".gemini/antigravity/global_skills"),
+            os.path.join(home, ".gemini/antigravity"),
+        ),
+        "cursor": ("Cursor", os.path.join(home, ".cursor/skills"), os.path.join(home, ".cursor")),
+        "trae": (
+            "Trae (字节)",
+            os.path.join(home, ".trae/skills"),
+            os.path.join(home, ".trae"),
+        ),
+    }
 
 
 def detect_targets(cached_targets: List[List[str]] = None) -> Tuple[List[str], List[str]]:
@@ -233,23 +413,8 @@ def detect_targets(cached_targets: List[List[str]] = None) -> Tuple[List[str], L
              print(f"{Colors.YELLOW}{Icons.WARN} 缓存的 IDE 路径无效，重新扫描...{Colors.NC}")
 
     # 2. Scan
-    home = os.path.expanduser("~")
-    check_list = [
-        (
-            "Antigravity Global (⚠️ 可能不生效 - 慎用)",
-            os.path.join(home, ".gemini/antigravity/global_skills"),
-            os.path.join(home, ".gemini/antigravity"),
-        ),
-        ("Cursor", os.path.join(home, ".cursor/skills"), os.path.join(home, ".cursor")),
-        (
-            "Trae (字节)",
-            os.path.join(home, ".trae/skills"),
-            os.path.join(home, ".trae"),
-        ),
-    ]
-
     print(f"{Colors.BLUE}{Icons.FIND} 正在扫描本地 IDE...{Colors.NC}")
-    for name, path_dir, parent_dir in check_list:
+    for name, path_dir, parent_dir in known_ides().values():
         if os.path.isdir(parent_dir):
             detected_names.append(name)
             detected_paths.append(path_dir)
@@ -308,8 +473,81 @@ def install_alias():
         )
 
 
+def read_skill_description(skill_md: str) -> str:
+    """Short description from a SKILL.md (frontmatter, '> 描述' line or first text line)."""
+    s_desc = ""
+    try:
+        with open(skill_md, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        # 1. Try YAML frontmatter
+        for line in lines:
+            if line.lower().startswith("description:"):
+                s_desc = line.split(":", 1)[1].strip().strip("\"'")
+                break
+
+        # 2. Try > Description
+        if not s_desc:
+            for line in lines:
+                if re.match(r"^> (描述|Description)：?", line):
+                    s_desc = re.sub(
+                        r"^> (描述|Description)：?", "", line
+                    ).strip()
+                    break
+
+        # 3. First non-empty, non-header line
+        if not s_desc:
+            for line in lines:
+                line = line.strip()
+                if (
+                    line
+                    and not line.startswith("---")
+                    and not line.startswith("#")
+                ):
+                    s_desc = line
+                    break
+
+        if not s_desc:
+            s_desc = "点击 SKILL.md 查看详情"
+
+        # Truncate
+        if len(s_desc) > 45:
+            s_desc = s_desc[:45] + "..."
+
+    except Exception:
+        s_desc = "Error reading description"
+    return s_desc
+
+
+def load_catalog() -> Dict[str, dict]:
+    """"<category>/<skill>" -> catalog entry from SKILLS_SRC/CATALOG_NAME."""
+    try:
+        with open(os.path.join(SKILLS_SRC, CATALOG_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == 1:
+            return data.get("skills", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_catalog(skills: Dict[str, dict]):
+    path = os.path.join(SKILLS_SRC, CATALOG_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "skills": skills}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.warning(f"保存技能目录索引失败: {e}")
+
+
 def get_repo_skills() -> Tuple[List[str], List[str], List[str]]:
-    """Scans for available skills in the repo."""
+    """
+    Scans for available skills in the repo.
+    Descriptions come from the skill catalog (CATALOG_NAME); a SKILL.md is
+    only parsed again when its mtime changed and its content hash differs.
+    """
     names = []
     paths = []
     descs = []
@@ -317,93 +555,586 @@ def get_repo_skills() -> Tuple[List[str], List[str], List[str]]:
     if not os.path.isdir(SKILLS_SRC):
         return names, paths, descs
 
+    catalog = load_catalog()
+    fresh = {}
     # Iterate categories
     for category in sorted(glob.glob(os.path.join(SKILLS_SRC, "*"))):
         if os.path.isdir(category):
             # Iterate skills
             for skill_dir in sorted(glob.glob(os.path.join(category, "*"))):
                 skill_md = os.path.join(skill_dir, "SKILL.md")
-                if os.path.isdir(skill_dir) and os.path.isfile(skill_md):
-                    s_name = os.path.basename(skill_dir)
-                    s_desc = ""
-
-                    try:
-                        with open(skill_md, "r", encoding="utf-8") as f:
-                            lines = f.readlines()
-
-                        # 1. Try YAML frontmatter
-                        for line in lines:
-                            if line.lower().startswith("description:"):
-                                s_desc = line.split(":", 1)[1].strip().strip("\"'")
-                                break
-
-                        # 2. Try > Description
-                        if not s_desc:
-                            for line in lines:
-                                if re.match(r"^> (描述|Description)：?", line):
-                                    s_desc = re.sub(
-                                        r"^> (描述|Description)：?", "", line
-                                    ).strip()
-                                    break
-
-                        # 3. First non-empty, non-header line
-                        if not s_desc:
-                            for line in lines:
-                                line = line.strip()
-                                if (
-                                    line
-                                    and not line.startswith("---")
-                                    and not line.startswith("#")
-                                ):
-                                    s_desc = line
-                                    break
-
-                        if not s_desc:
-                            s_desc = "点击 SKILL.md 查看详情"
-
-                        # Truncate
-                        if len(s_desc) > 45:
-                            s_desc = s_desc[:45] + "..."
-
-                    except Exception:
-                        s_desc = "Error reading description"
-
-                    names.append(s_name)
-                    paths.append(skill_dir)
-                    descs.append(s_desc)
-
+                if not os.path.isdir(skill_dir) or not os.path.isfile(skill_md):
+                    continue
+                s_name = os.path.basename(skill_dir)
+                key = f"{os.path.basename(category)}/{s_name}"
+                entry = catalog.get(key)
+                try:
+                    md_mtime = os.stat(skill_md).st_mtime_ns
+                    if not entry or entry.get("mdMtime") != md_mtime:
+                        md_hash = file_sha256(skill_md)
+                        if not entry or entry.get("mdHash") != md_hash:
+                            entry = dict(entry or {}, name=s_name, category=os.path.basename(category),
+                                         description=read_skill_description(skill_md), mdHash=md_hash)
+                        entry = dict(entry, mdMtime=md_mtime)  # a copy, so fresh != catalog and it is saved
+                except OSError:
+                    entry = {"name": s_name, "category": os.path.basename(category),
+                             "description": "Error reading description"}
+                fresh[key] = entry
+
+                names.append(s_name)
+                paths.append(skill_dir)
+                descs.append(entry["description"])
+
+    if fresh != catalog:
+        save_catalog(fresh)
     return names, paths, descs
 
 
+def catalog_hashes(skill_paths: List[str]) -> Dict[str, str]:
+    """
+    Brings the catalog's file records, file count, total bytes and content
+    hash up to date for the given skill directories, hashing only files
+    whose size or mtime changed. The content hash is computed like the
+    manifest's, so it equals the "hash" of a target copy that is current.
+    Returns: skill path -> content hash
+    """
+    catalog = load_catalog()
+    hashes = {}
+    dirty = False
+    for path in skill_paths:
+        entry = catalog.get(os.path.relpath(path, SKILLS_SRC).replace(os.sep, "/"), {})
+        old = entry.get("files", {})
+        files = {}
+        for rel, st in scan_files(path).items():
+            record = old.get(rel)
+            if record and record[0] == st.st_size and record[1] == st.st_mtime_ns:
+                files[rel] = record
+            else:
+                files[rel] = [st.st_size, st.st_mtime_ns, file_sha256(os.path.join(path, rel))]
+        hashes[path] = skill_hash(files)
+        if entry and (files != old or entry.get("hash") != hashes[path]):
+            entry.update(files=files, fileCount=len(files), totalBytes=sum(r[0] for r in files.values()),
+                         hash=hashes[path])
+            dirty = True
+    if dirty:
+        save_catalog(catalog)
+    return hashes
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan_files(root: str) -> Dict[str, os.stat_result]:
+    """Maps every file under root (relative path, '/' separated) to its stat."""
+    files = {}
+    pending = [("", root)]
+    while pending:
+        rel_dir, abs_dir = pending.pop()
+        try:
+            with os.scandir(abs_dir) as entries:
+                for entry in entries:
+                    if entry.name in SYNC_IGNORE:
+                        continue
+                    rel = rel_dir + entry.name
+                    if entry.is_dir():
+                        pending.append((rel + "/", entry.path))
+                    else:
+                        files[rel] = entry.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+    return files
+
+
+def skill_hash(files: Dict[str, list]) -> str:
+    """Content hash of a whole skill from its manifest file records."""
+    h = hashlib.sha256()
+    for rel in sorted(files):
+        h.update(f"{rel}\0{files[rel][2]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_manifest(target_path: str) -> Dict[str, dict]:
+    """Skill name -> {"hash", "files": {rel: [size, mtime_ns, sha256]}} of the last sync."""
+    try:
+        with open(os.path.join(target_path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f).get("skills", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_manifest(target_path: str, skills: Dict[str, dict]):
+    path = os.path.join(target_path, MANIFEST_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "skills": skills}, f)
+    os.replace(tmp, path)
+
+
+_no_link_devices = set()  # st_dev of targets where hardlinks into the store failed
+
+
+def _object_mode(mode: int) -> int:
+    """Permission bits of a store object holding a file with mode: read-only, exec bits kept."""
+    return stat.S_IMODE(mode) & 0o555 | 0o444
+
+
+def store_object(src_file: str, sha: str) -> str:
+    """
+    Adds a file to the content-addressed store (once per content hash).
+    Objects are read-only, so an in-place edit in one target cannot change
+    every other target sharing the same hardlink. The object keeps the mode
+    of the first file stored with its content.
+    Returns: object path
+    """
+    obj = os.path.join(STORE_DIR, sha)
+    if os.path.exists(obj):
+        return obj
+    os.makedirs(STORE_DIR, exist_ok=True)
+    tmp = f"{obj}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copy2(src_file, tmp)
+    os.chmod(tmp, _object_mode(os.stat(src_file).st_mode))
+    os.replace(tmp, obj)
+    return obj
+
+
+def prune_store(grace: float = STORE_GRACE) -> int:
+    """
+    Removes store objects no target links to any more (link count 1), once
+    their inode has been unchanged for grace seconds; linking or unlinking
+    a copy updates the ctime, so objects in use by a running sync are kept.
+    Returns: number of objects removed
+    """
+    removed = 0
+    cutoff = time.time() - grace
+    try:
+        entries = list(os.scandir(STORE_DIR))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            st = entry.stat(follow_symlinks=False)
+            if stat.S_ISREG(st.st_mode) and st.st_nlink == 1 and st.st_ctime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _clone_file(src_file: str, dest_file: str) -> bool:
+    """Copies data via reflink or copy_file_range where available. Returns False if neither applies."""
+    with open(src_file, "rb") as fsrc, open(dest_file, "wb") as fdst:
+        try:
+            import fcntl
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return True
+        except (ImportError, OSError):
+            pass
+        if not hasattr(os, "copy_file_range"):
+            return False
+        remaining = os.fstat(fsrc.fileno()).st_size
+        try:
+            while remaining > 0:
+                sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if sent == 0:
+                    break
+                remaining -= sent
+        except OSError:
+            fdst.seek(0)
+            fdst.truncate()
+            return False
+        return remaining == 0
+
+
+def deploy_file(src_file: str, dest_file: str, link: bool = True, mode: int = None) -> str:
+    """
+    Places a physical file at dest_file: hardlink to src_file when link is
+    set and the filesystem allows it, else reflink / copy_file_range, else
+    a plain copy. dest_file is replaced by rename, never written in place,
+    so a hardlinked store object is never modified through a target.
+    Copies get mode (default: src_file's permission bits) plus owner write.
+    Returns: "link" or "copy"
+    """
+    dest_dir = os.path.dirname(dest_file)
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp = os.path.join(dest_dir, f".{os.path.basename(dest_file)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        device = os.stat(dest_dir).st_dev
+        if link and device not in _no_link_devices:
+            try:
+                os.link(src_file, tmp)
+                os.replace(tmp, dest_file)
+                return "link"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                    raise
+                _no_link_devices.add(device)
+        if not _clone_file(src_file, tmp):
+            shutil.copyfile(src_file, tmp)
+        shutil.copystat(src_file, tmp)
+        os.chmod(tmp, (stat.S_IMODE(os.stat(tmp).st_mode) if mode is None else mode) | stat.S_IWUSR)
+        os.replace(tmp, dest_file)
+        return "copy"
+    finally:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+
+
+def _exchange(a: str, b: str) -> bool:
+    """Atomically swaps two paths (Linux renameat2 RENAME_EXCHANGE). Returns False if unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import ctypes
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    at_fdcwd, rename_exchange = -100, 2
+    return renameat2(at_fdcwd, os.fsencode(a), at_fdcwd, os.fsencode(b), rename_exchange) == 0
+
+
+def swap_in(new: str, dest: str, prev: str):
+    """
+    Moves the staged directory new to dest, keeping the replaced version at
+    prev. IDEs see either the old or the new skill, never a partial one.
+    """
+    if os.path.lexists(prev):
+        shutil.rmtree(prev)
+    os.makedirs(os.path.dirname(prev), exist_ok=True)
+    if not os.path.isdir(dest):
+        os.rename(new, dest)
+    elif _exchange(new, dest):
+        os.rename(new, prev)  # new now holds the replaced version
+    else:
+        os.rename(dest, prev)
+        try:
+            os.rename(new, dest)
+        except OSError:
+            os.rename(prev, dest)
+            raise
+
+
+def work_dir(target_path: str) -> str:
+    """Hidden per-target directory for staging, previous versions and the lock."""
+    return os.path.join(target_path, ".cf-sync")
+
+
+@contextmanager
+def target_lock(target_path: str):
+    """Serializes syncs of one target across threads and cf-sync processes."""
+    os.makedirs(work_dir(target_path), exist_ok=True)
+    with open(os.path.join(work_dir(target_path), "lock"), "a") as f:
+        try:
+            import fcntl
+        except ImportError:  # Windows: no advisory locks
+            yield
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def plan_skill(src: str, dest: str, entry: dict = None) -> Tuple[dict, list, Dict[str, os.stat_result], int]:
+    """
+    Compares src with its synced copy at dest without changing either.
+    entry is the skill's manifest record from the previous sync (None on
+    first sync).
+    Returns: (new_entry, changed [(rel, src_file, sha256)], src_files, files_removed)
+    """
+    old = (entry or {}).get("files", {})
+    src_files = scan_files(src)
+    legacy = os.path.islink(dest) or os.path.isfile(dest)  # old symlink mode, replaced by a copy
+    dest_files = {} if legacy else scan_files(dest)
+    files = {}
+    changed = []  # (rel, src_file, sha)
+
+    for rel, st in src_files.items():
+        record = old.get(rel)
+        have = dest_files.get(rel)
+        # Fast path: source untouched since the last sync and the copy is still there
+        if record and have and record[0] == st.st_size == have.st_size and record[1] == st.st_mtime_ns:
+            files[rel] = record
+            continue
+
+        src_file = os.path.join(src, rel)
+        sha = file_sha256(src_file)
+        files[rel] = [st.st_size, st.st_mtime_ns, sha]
+        if have and have.st_size == st.st_size:
+            # Only the mtime changed, or a copy from before the manifest existed
+            known = record[2] if record else file_sha256(os.path.join(dest, rel))
+            if known == sha:
+                continue
+        changed.append((rel, src_file, sha))
+
+    removed = len(dest_files.keys() - src_files.keys())
+    return {"hash": skill_hash(files), "files": files}, changed, src_files, removed
+
+
+def copy_intact(dest: str, entry: dict) -> bool:
+    """True if every file of the manifest entry exists in dest with its recorded size (one stat per file)."""
+    if os.path.islink(dest) or not os.path.isdir(dest):
+        return False
+    for rel, record in entry.get("files", {}).items():
+        try:
+            if os.stat(os.path.join(dest, rel)).st_size != record[0]:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def sync_skill(src: str, dest: str, entry: dict = None) -> Tuple[dict, int, int, int]:
+    """
+    Brings dest in line with src, deploying only added or changed files and
+    dropping files that no longer exist in src. A changed skill is built in
+    a staging directory (unchanged files hardlinked from the current copy)
+    and swapped in; the replaced version is kept for rollback_skill.
+    Deployed files are writable copies (reflinked where supported) with the
+    source's mode. With CF_SYNC_LINK=1 they are hardlinks to the read-only
+    store objects instead, unless the object's mode differs from the source's.
+    Call with the target lock held.
+    Returns: (new_entry, files_deployed, bytes_copied, files_removed);
+    hardlinked files add no bytes.
+    """
+    if os.path.islink(dest) or os.path.isfile(dest):
+        os.unlink(dest)  # left over from the old symlink mode
+    new_entry, changed, src_files, removed = plan_skill(src, dest, entry)
+    if not changed and not removed:
+        return new_entry, 0, 0, 0
+
+    name = os.path.basename(dest)
+    stage = os.path.join(work_dir(os.path.dirname(dest)), "stage", f"{name}-{os.getpid()}-{threading.get_ident()}")
+    copied_bytes = 0
+    link = os.environ.get(SYNC_LINK_ENV) == "1"
+    try:
+        changed_rels = set()
+        for rel, src_file, sha in changed:
+            changed_rels.add(rel)
+            mode = stat.S_IMODE(src_files[rel].st_mode)
+            if not link:
+                # Writable copies gain nothing from the store: deploy straight from the repo
+                method = deploy_file(src_file, os.path.join(stage, rel), link=False)
+                if method == "copy":
+                    copied_bytes += src_files[rel].st_size
+                continue
+            try:
+                obj = store_object(src_file, sha)
+            except OSError:
+                # Store unavailable (read-only cache, full disk): copy straight from the repo
+                method = deploy_file(src_file, os.path.join(stage, rel), link=False)
+            else:
+                # Same content stored from a file with other exec bits: a link would carry the wrong mode
+                same_mode = stat.S_IMODE(os.stat(obj).st_mode) == _object_mode(mode)
+                method = deploy_file(obj, os.path.join(stage, rel), link=link and same_mode, mode=mode)
+            if method == "copy":
+                copied_bytes += src_files[rel].st_size
+        for rel in src_files.keys() - changed_rels:
+            # Same filesystem as dest, so this links rather than copies; read-only
+            # store links from a linked sync are turned back into copies
+            current = os.path.join(dest, rel)
+            writable = bool(os.stat(current).st_mode & stat.S_IWUSR)
+            if deploy_file(current, os.path.join(stage, rel), link=link or writable) == "copy":
+                copied_bytes += src_files[rel].st_size
+        swap_in(stage, dest, os.path.join(work_dir(os.path.dirname(dest)), "prev", name))
+    except Exception:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+
+    return new_entry, len(changed), copied_bytes, removed
+
+
+def rollback_skill(target_path: str, s_name: str) -> bool:
+    """
+    Swaps a skill back to the version replaced by its last sync (running it
+    again redoes the sync). Returns False if there is no previous version.
+    """
+    dest = os.path.join(target_path, s_name)
+    prev = os.path.join(work_dir(target_path), "prev", s_name)
+    if not os.path.isdir(prev):
+        return False
+    with target_lock(target_path):
+        if not os.path.isdir(dest):
+            os.rename(prev, dest)
+        elif not _exchange(prev, dest):
+            swap_in(prev, dest, prev + ".tmp")
+            os.rename(prev + ".tmp", prev)
+        manifest = load_manifest(target_path)
+        manifest.pop(s_name, None)  # dest no longer matches it; the next sync re-hashes
+        save_manifest(target_path, manifest)
+    return True
+
+
 def sync_now(
     target_path: str,
     target_name: str,
     selected_indices: List[int],
     all_names: List[str],
     all_paths: List[str],
-):
-    print(f"\n{Colors.BLUE}{Icons.SYNC} 同步至 {target_name} (copy 模式)...{Colors.NC}")
-    if not os.path.exists(target_path):
-        os.makedirs(target_path)
+    out: Callable[[str], None] = print,
+    dry_run: bool = False,
+    src_hashes: Dict[str, str] = None,
+) -> SyncResult:
+    """
+    Syncs the selected skills to one target. src_hashes (skill path ->
+    catalog content hash) lets skills whose hash matches the manifest be
+    skipped without comparing files.
+    """
+    result = SyncResult(target_name, target_path)
+    if dry_run:
+        out(f"\n{Colors.BLUE}{Icons.FIND} 预演 {target_name} (不写入)...{Colors.NC}")
+        _sync_skills(target_path, selected_indices, all_names, all_paths, out, result, True, src_hashes)
+        return result
+
+    out(f"\n{Colors.BLUE}{Icons.SYNC} 同步至 {target_name} (copy 模式)...{Colors.NC}")
+    try:
+        os.makedirs(target_path, exist_ok=True)
+    except OSError as e:
+        result.errors.append(str(e))
+        out(f"  {Colors.RED}[ERROR]{Colors.NC} {e}")
+        return result
+
+    with target_lock(target_path):
+        # Staging dirs left by an interrupted run; nothing else can be using them under the lock
+        shutil.rmtree(os.path.join(work_dir(target_path), "stage"), ignore_errors=True)
+        _sync_skills(target_path, selected_indices, all_names, all_paths, out, result, src_hashes=src_hashes)
+    return result
 
+
+def _sync_skills(
+    target_path: str,
+    selected_indices: List[int],
+    all_names: List[str],
+    all_paths: List[str],
+    out: Callable[[str], None],
+    result: SyncResult,
+    dry_run: bool = False,
+    src_hashes: Dict[str, str] = None,
+):
+    manifest = load_manifest(target_path)
     for idx in selected_indices:
         s_name = all_names[idx]
         s_path = all_paths[idx]
         dest = os.path.join(target_path, s_name)
 
-        # Remove old
-        if os.path.exists(dest):
-            if os.path.islink(dest):
-                os.unlink(dest)
+        # Catalog hash equals the last synced one and the copy looks intact: nothing to compare
+        last_hash = manifest.get(s_name, {}).get("hash")
+        if src_hashes and last_hash and src_hashes.get(s_path) == last_hash and copy_intact(dest, manifest[s_name]):
+            result.skipped.append(s_name)
+            continue
+
+        try:
+            if dry_run:
+                entry, changed, src_files, removed = plan_skill(s_path, dest, manifest.get(s_name))
+                copied, copied_bytes = len(changed), sum(src_files[rel].st_size for rel, _, _ in changed)
             else:
-                shutil.rmtree(dest)
+                entry, copied, copied_bytes, removed = sync_skill(s_path, dest, manifest.get(s_name))
+        except Exception as e:
+            # Forget the record so the next run re-checks every file
+            manifest.pop(s_name, None)
+            result.errors.append(f"{s_name}: {e}")
+            out(f"  {Colors.RED}[ERROR]{Colors.NC} {s_name}: {e}")
+            continue
+
+        manifest[s_name] = entry
+        if copied or removed:
+            result.updated.append(s_name)
+            result.files_copied += copied
+            result.bytes_copied += copied_bytes
+            result.files_removed += removed
+            label = "[PLAN]" if dry_run else "[COPY]"
+            out(f"  {Colors.GREEN}{label}{Colors.NC} {s_name} ({copied} 个文件更新, {removed} 个删除)")
+        else:
+            result.skipped.append(s_name)
+
+    if result.skipped:
+        out(f"  {Colors.CYAN}[SKIP]{Colors.NC} {len(result.skipped)} 个技能无变化")
+    if dry_run:
+        return
+    try:
+        save_manifest(target_path, manifest)
+    except OSError as e:
+        out(f"{Colors.YELLOW}{Icons.WARN} 无法写入同步清单: {e}{Colors.NC}")
+
+
+def sync_workers(job_count: int) -> int:
+    """Thread count for parallel syncs; copying is I/O bound, so more than the CPU count."""
+    value = os.environ.get(SYNC_WORKERS_ENV)
+    if value and value.isdigit():
+        return max(1, min(int(value), job_count))
+    return max(1, min(16, (os.cpu_count() or 2) * 2, job_count))
+
+
+def sync_targets(
+    jobs: List[Tuple[str, str]],
+    selected_indices: List[int],
+    all_names: List[str],
+    all_paths: List[str],
+    dry_run: bool = False,
+) -> List[SyncResult]:
+    """
+    Runs sync_now for every (target_path, target_name) job concurrently.
+    Each target's output is buffered and printed as one block, in job order.
+    With dry_run, results hold the planned files and bytes instead.
+    """
+    # The same directory twice would race on its manifest
+    unique = {}
+    for target_path, target_name in jobs:
+        unique.setdefault(os.path.realpath(target_path), (target_path, target_name))
+    jobs = list(unique.values())
+    if not jobs:
+        return []
+    # Source files are checked once here instead of once per target
+    try:
+        src_hashes = catalog_hashes([all_paths[i] for i in selected_indices])
+    except OSError:
+        src_hashes = None  # a file vanished mid-scan; fall back to per-file comparison
 
-        # Copy new
+    def run(job: Tuple[str, str]) -> Tuple[SyncResult, List[str]]:
+        lines = []
+        target_path, target_name = job
         try:
-            shutil.copytree(s_path, dest)
-            print(f"  {Colors.GREEN}[COPY]{Colors.NC} {s_name}")
+            result = sync_now(target_path, target_name, selected_indices, all_names, all_paths,
+                              lines.append, dry_run, src_hashes)
         except Exception as e:
-            print(f"  {Colors.RED}[ERROR]{Colors.NC} {s_name}: {e}")
+            result = SyncResult(target_name, target_path, errors=[str(e)])
+            lines.append(f"  {Colors.RED}[ERROR]{Colors.NC} {target_name}: {e}")
+        return result, lines
+
+    results = []
+    with ThreadPoolExecutor(max_workers=sync_workers(len(jobs))) as pool:
+        for result, lines in pool.map(run, jobs):
+            print("\n".join(lines))
+            results.append(result)
+    if not dry_run:
+        prune_store()
+    return results
+
+
+def report_results(results: List[SyncResult], dry_run: bool = False) -> int:
+    """Prints the totals and every error across targets. Returns the error count."""
+    updated = sum(len(r.updated) for r in results)
+    files = sum(r.files_copied for r in results)
+    size = sum(r.bytes_copied for r in results)
+    if dry_run:
+        print(f"\n{Colors.BLUE}{Icons.COPY} 计划: {len(results)} 个目标, {updated} 个技能需更新, "
+              f"{files} 个文件 ({size / 1024:.1f} KB), {sum(r.files_removed for r in results)} 个删除{Colors.NC}")
+    else:
+        print(f"\n{Colors.BLUE}{Icons.COPY} {len(results)} 个目标, {updated} 个技能更新, "
+              f"{files} 个文件已部署 (实际复制 {size / 1024:.1f} KB, 其余为硬链接){Colors.NC}")
+
+    errors = [(r.target, e) for r in results for e in r.errors]
+    if errors:
+        print(f"{Colors.RED}{Icons.WARN} {len(errors)} 个错误:{Colors.NC}")
+        for target, error in errors:
+            print(f"  {Colors.RED}-{Colors.NC} {target}: {error}")
+    return len(errors)
 
 
 def ensure_git_local_ignore(project_root: str, pattern: str):
@@ -519,7 +1250,292 @@ def get_user_selection(
     return selected
 
 
+class InotifyWatcher:
+    """Recursive inotify watch on a directory tree (Linux, via libc)."""
+
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self, root: str):
+        import ctypes
+        self.root = root
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wds = {}  # watch descriptor -> directory
+        self._add_tree(root)
+
+    def _add_tree(self, root: str):
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SYNC_IGNORE]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self.wds[wd] = dirpath
+
+    def wait(self, timeout: float = None) -> List[str]:
+        """Paths changed within timeout seconds (None = block until something changes)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                changed.append(self.root)  # events were lost: treat everything as changed
+                continue
+            if mask & self.IN_IGNORED:
+                self.wds.pop(wd, None)
+                continue
+            path = os.path.join(self.wds.get(wd, self.root), name)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._add_tree(path)
+            changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher comparing size/mtime snapshots of a directory tree."""
+
+    def __init__(self, root: str, interval: float = WATCH_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        return {rel: (st.st_size, st.st_mtime_ns) for rel, st in scan_files(self.root).items()}
+
+    def wait(self, timeout: float = None) -> List[str]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._snapshot()
+        changed = [rel for rel in current.keys() | self.snapshot.keys() if current.get(rel) != self.snapshot.get(rel)]
+        self.snapshot = current
+        return [os.path.join(self.root, rel) for rel in changed]
+
+    def close(self):
+        pass
+
+
+def make_watcher(root: str):
+    """inotify where available, polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def remembered_jobs(prefs: Prefs) -> List[Tuple[str, str]]:
+    """(target_path, target_name) of the last interactive sync, from Prefs."""
+    jobs = []
+    for idx in prefs.lastIdeIndexes:
+        if not 0 <= idx < len(prefs.cachedIdeTargets):
+            continue
+        t_name, t_path = prefs.cachedIdeTargets[idx]
+        if t_path == "__PROJECT_SELECT__":
+            for project_path in prefs.lastProjects:
+                if os.path.isdir(project_path):
+                    jobs.append((os.path.join(project_path, ".agent", "skills"),
+                                 f"Antigravity Project ({os.path.basename(project_path)})"))
+        else:
+            jobs.append((t_path, t_name))
+    return jobs
+
+
+def changed_skill_dirs(paths: List[str]) -> set:
+    """Skill directories (<SKILLS_SRC>/<category>/<skill>) touched by changed paths; SKILLS_SRC means all."""
+    dirs = set()
+    for path in paths:
+        parts = os.path.relpath(path, SKILLS_SRC).split(os.sep)
+        if parts[0] in (".", ""):
+            dirs.add(SKILLS_SRC)
+        elif len(parts) >= 2 and parts[0] != "..":
+            dirs.add(os.path.join(SKILLS_SRC, parts[0], parts[1]))
+    return dirs
+
+
+def watch(prefs: Prefs) -> int:
+    """Live-syncs edits under SKILLS_SRC to the remembered targets until Ctrl+C. Returns exit code."""
+    jobs = remembered_jobs(prefs)
+    names, paths, _ = get_repo_skills()
+    selected_names = {names[i] for i in prefs.lastSkillIndexes if 0 <= i < len(names)}
+    if not jobs or not selected_names:
+        print(f"{Colors.YELLOW}{Icons.WARN} 没有记住的同步目标或技能，请先运行一次交互式同步。{Colors.NC}")
+        return 1
+
+    watcher = make_watcher(SKILLS_SRC)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else f"轮询 {watcher.interval}s"
+    print(f"{Colors.BLUE}{Icons.FIND} 正在监听 {SKILLS_SRC} ({mode})，"
+          f"{len(selected_names)} 个技能 -> {len(jobs)} 个目标，Ctrl+C 退出{Colors.NC}")
+
+    pending = []
+    try:
+        while True:
+            changed = watcher.wait(WATCH_DEBOUNCE if pending else None)
+            if changed:
+                pending.extend(changed)  # keep collecting until the burst goes quiet
+                continue
+            if not pending:
+                continue
+
+            dirs = changed_skill_dirs(pending)
+            pending = []
+            names, paths, _ = get_repo_skills()  # skills may have been added or renamed
+            indices = [i for i, (s_name, s_path) in enumerate(zip(names, paths))
+                       if s_name in selected_names and (SKILLS_SRC in dirs or s_path in dirs)]
+            if not indices:
+                continue
+            print(f"\n{Colors.PURPLE}{Icons.SYNC} [{time.strftime('%H:%M:%S')}] "
+                  f"检测到改动: {', '.join(names[i] for i in indices)}{Colors.NC}")
+            report_results(sync_targets(jobs, indices, names, paths))
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}已停止监听{Colors.NC}")
+        return 0
+    finally:
+        watcher.close()
+
+
+def read_project_list(path: str) -> List[str]:
+    """Project paths from a file (one per line, '#' comments, '-' = stdin)."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    projects = []
+    for line in lines:
+        line = line.strip().strip("'\"")
+        if line and not line.startswith("#"):
+            projects.append(os.path.abspath(os.path.expanduser(line)))
+    return projects
+
+
+def parse_headless_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="sync-skills.py",
+        description="Core Foundry Skills 非交互同步 (用于脚本和批量部署)",
+        epilog="退出码: 0 成功, 1 有同步错误, 2 参数错误/未确认",
+    )
+    parser.add_argument("--ide", default="", help=f"目标 IDE，逗号分隔: {', '.join(known_ides())}, project")
+    parser.add_argument("--skills", default="", help="技能名，逗号分隔，或 all")
+    parser.add_argument("--projects-from", metavar="FILE",
+                        help="项目路径列表 (每行一个，'-' 为标准输入)，同步到 <项目>/.agent/skills")
+    parser.add_argument("--yes", "-y", action="store_true", help="不询问，直接同步")
+    parser.add_argument("--dry-run", action="store_true", help="只统计将要复制的文件和体积，不写入")
+    parser.add_argument("--json", action="store_true", help="在 stdout 输出 JSON 结果 (进度信息改到 stderr)")
+    return parser.parse_args(argv)
+
+
+def run_headless(argv: List[str]) -> int:
+    """Non-interactive sync for provisioning scripts. Returns the exit code."""
+    args = parse_headless_args(argv)
+    with redirect_stdout(sys.stderr if args.json else sys.stdout):
+        code, report = _headless_sync(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    return code
+
+
+def _headless_sync(args: argparse.Namespace) -> Tuple[int, dict]:
+    def usage(message: str) -> Tuple[int, dict]:
+        print(f"{Colors.RED}{Icons.WARN} {message}{Colors.NC}")
+        return EXIT_USAGE, {"ok": False, "error": message}
+
+    ides = known_ides()
+    ide_ids = [i.strip().lower() for i in args.ide.split(",") if i.strip()]
+    unknown = [i for i in ide_ids if i not in ides and i != "project"]
+    if unknown:
+        return usage(f"未知 IDE: {', '.join(unknown)} (可选: {', '.join(ides)}, project)")
+    if "project" in ide_ids and not args.projects_from:
+        return usage("--ide project 需要配合 --projects-from")
+    if not ide_ids and not args.projects_from:
+        return usage("需要 --ide 或 --projects-from")
+
+    names, paths, _ = get_repo_skills()
+    requested = [s.strip() for s in args.skills.split(",") if s.strip()]
+    if not requested:
+        return usage("需要 --skills (技能名，逗号分隔，或 all)")
+    if requested == ["all"]:
+        selected = list(range(len(names)))
+    else:
+        missing = [s for s in requested if s not in names]
+        if missing:
+            return usage(f"未知技能: {', '.join(missing)}")
+        selected = [names.index(s) for s in requested]
+
+    jobs = []
+    skipped_targets = []
+    for ide in ide_ids:
+        if ide == "project":
+            continue
+        name, path_dir, parent_dir = ides[ide]
+        if os.path.isdir(parent_dir):
+            jobs.append((path_dir, name))
+        else:
+            skipped_targets.append({"target": ide, "reason": "not installed"})
+            print(f"{Colors.YELLOW}{Icons.WARN} 未安装 {name}，跳过{Colors.NC}")
+    if args.projects_from:
+        try:
+            projects = read_project_list(args.projects_from)
+        except OSError as e:
+            return usage(f"无法读取项目列表: {e}")
+        for project_path in projects:
+            if not os.path.isdir(project_path):
+                skipped_targets.append({"target": project_path, "reason": "not a directory"})
+                print(f"{Colors.YELLOW}{Icons.WARN} 无效的目录，跳过: {project_path}{Colors.NC}")
+                continue
+            jobs.append((os.path.join(project_path, ".agent", "skills"),
+                         f"Antigravity Project ({os.path.basename(project_path)})"))
+
+    if not args.dry_run and not args.yes:
+        if not sys.stdin.isatty():
+            return usage("非交互模式需要 --yes 确认 (或使用 --dry-run 预演)")
+        choice = input(f"将同步 {len(selected)} 个技能到 {len(jobs)} 个目标，继续？[y/N]: ").strip().lower()
+        if choice != "y":
+            return usage("操作已取消")
+
+    if not args.dry_run:
+        for target_path, _ in jobs:
+            if target_path.endswith(os.path.join(".agent", "skills")):
+                ensure_git_local_ignore(os.path.dirname(os.path.dirname(target_path)), ".agent/skills/")
+
+    results = sync_targets(jobs, selected, names, paths, dry_run=args.dry_run)
+    error_count = report_results(results, dry_run=args.dry_run)
+    report = {
+        "ok": error_count == 0,
+        "dry_run": args.dry_run,
+        "skills": [names[i] for i in selected],
+        "targets": [asdict(r) for r in results],
+        "skipped_targets": skipped_targets,
+        "totals": {
+            "targets": len(results),
+            "skills_updated": sum(len(r.updated) for r in results),
+            "files": sum(r.files_copied for r in results),
+            "bytes": sum(r.bytes_copied for r in results),
+            "files_removed": sum(r.files_removed for r in results),
+            "errors": error_count,
+        },
+    }
+    return (EXIT_ERRORS if error_count else EXIT_OK), report
+
+
 def main():
+    # Non-interactive mode for provisioning: any headless flag skips all prompts
+    if any(arg.split("=", 1)[0] in HEADLESS_FLAGS for arg in sys.argv[1:]):
+        sys.exit(run_headless(sys.argv[1:]))
+
     print(f"{Colors.CYAN}==============================================={Colors.NC}")
     print(f"{Colors.CYAN}      🚀 Core Foundry Skills Manager (Python)  {Colors.NC}")
     print(f"{Colors.CYAN}      (运行 'python3 scripts/sync-skills.py clean' 可强制清除缓存){Colors.NC}")
@@ -537,10 +1553,31 @@ def main():
             print(f"{Colors.YELLOW}{Icons.WARN} 缓存文件不存在 ({PREF_FILE})，无需清除。{Colors.NC}")
         sys.exit(0)
 
+    # Handle Rollback: sync-skills.py rollback <目标目录> [skill ...]
+    if len(sys.argv) > 1 and sys.argv[1] == "rollback":
+        if len(sys.argv) < 3:
+            print(f"{Colors.YELLOW}用法: python3 scripts/sync-skills.py rollback <目标目录> [skill ...]{Colors.NC}")
+            sys.exit(2)
+        target = os.path.abspath(os.path.expanduser(sys.argv[2]))
+        prev_dir = os.path.join(work_dir(target), "prev")
+        names = sys.argv[3:] or (sorted(os.listdir(prev_dir)) if os.path.isdir(prev_dir) else [])
+        failed = 0
+        for s_name in names:
+            if rollback_skill(target, s_name):
+                print(f"  {Colors.GREEN}[ROLLBACK]{Colors.NC} {s_name}")
+            else:
+                failed += 1
+                print(f"  {Colors.YELLOW}{Icons.WARN} {s_name}: 没有可回滚的上一版本{Colors.NC}")
+        sys.exit(1 if failed or not names else 0)
+
     # Load prefs first
     prefs = load_prefs()
 
-    check_git_status()
+    if "--watch" in sys.argv:
+        sys.exit(watch(prefs))
+
+    # Remote update check runs in the background; reported after the sync
+    report_updates = start_update_check(prefs)
 
     # Detect Targets (with cache)
     targets, target_paths = detect_targets(prefs.cachedIdeTargets)
@@ -576,7 +1613,9 @@ def main():
     if not selected_skill_indixes:
         sys.exit(0)
 
-    # Sync to selected targets
+    # Collect (path, name) sync jobs, then run them in parallel
+    jobs = []
+    synced_projects = []
     for idx in selected_ide_indexes:
         t_path = target_paths[idx]
         t_name = targets[idx]
@@ -604,8 +1643,16 @@ def main():
             search_roots = sorted(list(set(search_roots)))
 
             # Project Selection Loop (to handle Rescan and Manual Add)
+            full_rescan = False
             while True:
-                available_projects, is_from_cache = find_projects(search_roots, prefs.cachedProjects)
+                available_projects, is_from_cache = find_projects(
+                    search_roots,
+                    prefs.cachedProjects,
+                    max_depth=prefs.scanDepth,
+                    skip_dirs=SCAN_SKIP_DIRS | set(prefs.scanSkipDirs),
+                    full_rescan=full_rescan,
+                )
+                full_rescan = False
                 
                 # Save Project cache if freshly scanned
                 if not is_from_cache:
@@ -661,6 +1708,7 @@ def main():
                 if rescan_index in selected_proj_indices:
                      # Force clear cache and loop again
                      prefs.cachedProjects = [] 
+                     full_rescan = True
                      print(f"\n{Colors.BLUE}正在刷新项目列表...{Colors.NC}")
                      continue
                 
@@ -681,13 +1729,8 @@ def main():
                     # Pre-flight: Ensure .agent/skills/ is ignored locally
                     ensure_git_local_ignore(project_path, ".agent/skills/")
 
-                    sync_now(
-                        dest_path,
-                        f"Antigravity Project ({project_name})",
-                        selected_skill_indixes,
-                        skill_names,
-                        skill_paths,
-                    )
+                    jobs.append((dest_path, f"Antigravity Project ({project_name})"))
+                    synced_projects.append(project_path)
                     nothing_synced = False
                 
                 if not nothing_synced:
@@ -696,22 +1739,25 @@ def main():
                     break # Break if nothing selected properly
         else:
             # Standard Sync
-            sync_now(
-                t_path,
-                t_name,
-                selected_skill_indixes,
-                skill_names,
-                skill_paths,
-            )
+            jobs.append((t_path, t_name))
+
+    results = sync_targets(jobs, selected_skill_indixes, skill_names, skill_paths)
+    error_count = report_results(results)
+    report_updates()  # before saving prefs, which keep its result for the next run
 
     # Save final prefs (preserve cache, update selections)
     prefs.lastIdeIndexes = selected_ide_indexes
     prefs.lastSkillIndexes = selected_skill_indixes
+    if synced_projects:
+        prefs.lastProjects = synced_projects
     save_prefs(prefs)
 
     # Alias
     install_alias()
 
+    if error_count:
+        print(f"\n{Colors.YELLOW}{Icons.WARN} 同步完成，但有 {error_count} 个错误 (见上方列表){Colors.NC}")
+        sys.exit(1)
     print(f"\n{Colors.GREEN}{Icons.OK} 全部同步任务完成！{Colors.NC}")
     print(
         "提示：如果是首次安装别名，请重启终端或执行 source ~/.zshrc (或 ~/.bashrc) 生效。"
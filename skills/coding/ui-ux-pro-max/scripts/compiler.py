@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Dataset Compiler - Validates the CSV datasets against their column
+config, normalizes them and emits compiled search indexes.
+
+Usage: python compiler.py [--check] [--json]
+
+Every dataset in CSV_CONFIG and STACK_CONFIG is checked at build time instead
+of producing silent misses at query time:
+  - search_cols / output_cols / filter_cols must exist in the CSV header
+  - files must be UTF-8 (a BOM is dropped) and rows may not have extra cells
+  - cells may not contain line breaks (the usual sign of a broken quote)
+Cells are NFC-normalized with whitespace collapsed, short rows are padded with
+empty cells and rows that repeat an earlier row (ignoring "No") are dropped.
+
+Compiled indexes are written to $UIPRO_CACHE_DIR (default
+~/.cache/ui-ux-pro-max) and reused by core until the CSV changes on disk.
+Postings, lengths, rows and snippet term offsets are read through a read-only memory map, so
+concurrent search processes share them via the page cache instead of each
+building a private copy. Set UIPRO_CACHE_DIR to an empty string to keep
+indexes in memory only.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from tracing import span
+
+CACHE_ENV = "UIPRO_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "ui-ux-pro-max"
+COMPILED_VERSION = 6
+
+
+class DatasetError(ValueError):
+    """Raised when a dataset does not match its column config or cannot be parsed"""
+
+
+# ============ NORMALIZATION ============
+def normalize_cell(value):
+    """NFC text with runs of whitespace (including NBSP) collapsed to one space"""
+    if value is None:
+        return ""
+    return " ".join(unicodedata.normalize("NFC", value).split())
+
+
+def check_config(config, header):
+    """List of problems between a dataset config and a CSV header"""
+    problems = []
+    if not header:
+        return ["missing header row"]
+    duplicates = sorted({col for col in header if header.count(col) > 1})
+    if duplicates:
+        problems.append(f"duplicate header columns: {', '.join(duplicates)}")
+    for kind in ("search_cols", "output_cols", "filter_cols"):
+        missing = [col for col in config.get(kind, ()) if col not in header]
+        if missing:
+            problems.append(f"{kind} not in header: {', '.join(missing)}")
+    return problems
+
+
+def _read_text(filepath):
+    """Decode a CSV file as UTF-8, dropping a BOM"""
+    data = Path(filepath).read_bytes()
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        line = data[:e.start].count(b"\n") + 1
+        raise DatasetError(f"{filepath}: not valid UTF-8 (line {line})")
+
+
+def compile_csv(filepath, config):
+    """Validate and normalize a dataset, returns (rows, stats).
+
+    rows are dicts holding every header column, so callers can index them
+    directly. Raises DatasetError listing every problem found in the file.
+    """
+    with span("compile_csv", file=Path(filepath).name):
+        reader = csv.reader(io.StringIO(_read_text(filepath), newline=""))
+        header = [normalize_cell(col) for col in next(reader, [])]
+        problems = check_config(config, header)
+
+        rows = []
+        seen = set()
+        stats = {"rows": 0, "duplicates": 0, "normalized_cells": 0, "padded_rows": 0}
+        for values in reader:
+            line = reader.line_num
+            if not any(value.strip() for value in values):
+                continue
+            if len(values) > len(header):
+                problems.append(f"line {line}: {len(values)} cells for {len(header)} columns")
+                continue
+            if any("\n" in value or "\r" in value for value in values):
+                problems.append(f"line {line}: line break inside a cell (unbalanced quotes?)")
+                continue
+            if len(values) < len(header):
+                stats["padded_rows"] += 1
+                values = values + [""] * (len(header) - len(values))
+
+            row = {}
+            for col, value in zip(header, values):
+                row[col] = normalize_cell(value)
+                if row[col] != value:
+                    stats["normalized_cells"] += 1
+            content = tuple(value for col, value in row.items() if col != "No")
+            if content in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(content)
+            rows.append(row)
+
+        if problems:
+            raise DatasetError(f"{filepath}:\n  " + "\n  ".join(problems))
+        stats["rows"] = len(rows)
+        return rows, stats
+
+
+# ============ COMPILED INDEXES ============
+# File layout (little-endian), read through a read-only memory map so every
+# process searching the same dataset shares one copy in the OS page cache:
+#   header    magic, version, metadata length
+#   metadata  JSON: key, signature, index state, term directory, sizes (JSON rather
+#             than pickle, so a writable cache dir cannot inject code)
+#   int32     postings doc ids, postings tfs (per term, sorted by doc id)
+#   int32     document lengths by doc id - base (-1 = no such document)
+#   int64     row offsets into the rows blob (span + 1 entries)
+#   int64     term offset record ranges by doc id - base (span + 1 entries)
+#   int32     term offset records (term id, output column, start, end) as four
+#             parallel arrays, sorted by term id within each document
+#   bytes     rows blob, one JSON object per document
+_MAGIC = b"UIPROIDX"
+_HEADER = struct.Struct("<8sIQ")
+
+
+def cache_dir():
+    """Directory for compiled indexes, or None when disabled"""
+    value = os.environ.get(CACHE_ENV)
+    if value is None:
+        return DEFAULT_CACHE_DIR
+    return Path(value).expanduser() if value else None
+
+
+def _compiled_path(key):
+    """Compiled index file for an index cache key"""
+    directory = cache_dir()
+    if directory is None:
+        return None
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=10).hexdigest()
+    return directory / "compiled" / f"{digest}.idx"
+
+
+def _as_json(value):
+    """value as it reads back from JSON (tuples become lists)"""
+    return json.loads(json.dumps(value))
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+class _PostingList:
+    """Read-only {doc_id: tf} view over one term's slice of the mapped arrays"""
+
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self, docs, tfs):
+        self.docs = docs
+        self.tfs = tfs
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, doc_id):
+        return self.get(doc_id) is not None
+
+    def items(self):
+        return zip(self.docs, self.tfs)
+
+    def get(self, doc_id, default=None):
+        i = bisect_left(self.docs, doc_id)
+        if i < len(self.docs) and self.docs[i] == doc_id:
+            return self.tfs[i]
+        return default
+
+
+class _MappedPostings:
+    """Read-only term -> posting list mapping over the mapped postings arrays"""
+
+    __slots__ = ("terms", "docs", "tfs")
+
+    def __init__(self, terms, docs, tfs):
+        self.terms = terms
+        self.docs = docs
+        self.tfs = tfs
+
+    def __len__(self):
+        return len(self.terms)
+
+    def get(self, term, default=None):
+        entry = self.terms.get(term)
+        if entry is None:
+            return default
+        start, count = entry
+        return _PostingList(self.docs[start:start + count], self.tfs[start:start + count])
+
+    def items(self):
+        for term in self.terms:
+            yield term, self.get(term)
+
+
+class _MappedLengths:
+    """Read-only doc_id -> token count over the mapped lengths array"""
+
+    __slots__ = ("lengths", "base", "count")
+
+    def __init__(self, lengths, base, count):
+        self.lengths = lengths
+        self.base = base
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, doc_id):
+        i = doc_id - self.base
+        if 0 <= i < len(self.lengths) and self.lengths[i] >= 0:
+            return self.lengths[i]
+        raise KeyError(doc_id)
+
+    def __contains__(self, doc_id):
+        i = doc_id - self.base
+        return 0 <= i < len(self.lengths) and self.lengths[i] >= 0
+
+    def __iter__(self):
+        return (doc_id for doc_id, _ in self.items())
+
+    def items(self):
+        for i, length in enumerate(self.lengths):
+            if length >= 0:
+                yield self.base + i, length
+
+
+class MappedSegment:
+    """Index segment whose postings and lengths stay in the memory map; deletions are per process"""
+
+    __slots__ = ("postings", "lengths", "deleted")
+
+    def __init__(self, postings, lengths):
+        self.postings = postings
+        self.lengths = lengths
+        self.deleted = set()
+
+    def terms_of(self, doc_id):
+        """Unique terms of one document (a scan, only needed when deleting)"""
+        return tuple(term for term, postings in self.postings.items() if doc_id in postings)
+
+
+class MappedRows(dict):
+    """doc_id -> row dict, decoded from the memory map on first access.
+
+    Behaves like the plain rows dict: assignments and pops apply on top of
+    the mapped rows, and popped rows are not decoded again.
+    """
+
+    def __init__(self, offsets, blob, base):
+        super().__init__()
+        self._offsets = offsets
+        self._blob = blob
+        self._base = base
+        self._dropped = set()
+
+    def __missing__(self, doc_id):
+        i = doc_id - self._base
+        if doc_id in self._dropped or not 0 <= i < len(self._offsets) - 1:
+            raise KeyError(doc_id)
+        start, end = self._offsets[i], self._offsets[i + 1]
+        if start == end:
+            raise KeyError(doc_id)
+        row = json.loads(bytes(self._blob[start:end]))
+        self[doc_id] = row
+        return row
+
+    def get(self, doc_id, default=None):
+        try:
+            return self[doc_id]
+        except KeyError:
+            return default
+
+    def pop(self, doc_id, *default):
+        self._dropped.add(doc_id)
+        return super().pop(doc_id, *default)
+
+
+class TermOffsets(dict):
+    """doc_id -> {column: {term: [(start, end), ...]}} for snippet highlighting"""
+
+    def spans(self, doc_id, terms):
+        """{column: sorted (start, end) spans of terms} for one document"""
+        fields = {}
+        for col, offsets in self.get(doc_id, {}).items():
+            spans = sorted(span for term in terms for span in offsets.get(term, ()))
+            if spans:
+                fields[col] = spans
+        return fields
+
+
+class MappedOffsets(TermOffsets):
+    """TermOffsets over the mapped offset records; a lookup costs a binary
+    search per query term plus one step per match.
+
+    Documents added or popped in this process are kept as plain entries on
+    top, like MappedRows.
+    """
+
+    def __init__(self, ranges, terms, cols, starts, ends, term_ids, columns, base):
+        super().__init__()
+        self._ranges = ranges
+        self._terms = terms
+        self._cols = cols
+        self._starts = starts
+        self._ends = ends
+        self._term_ids = term_ids
+        self._columns = columns
+        self._base = base
+        self._names = None  # term id -> term, built on first full decode
+        self._dropped = set()
+
+    def spans(self, doc_id, terms):
+        if doc_id in self:
+            return super().spans(doc_id, terms)
+        i = doc_id - self._base
+        if doc_id in self._dropped or not 0 <= i < len(self._ranges) - 1:
+            return {}
+        lo, hi = self._ranges[i], self._ranges[i + 1]
+        doc_terms = self._terms[lo:hi]
+        by_col = {}
+        for term in set(terms):
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                continue
+            for r in range(lo + bisect_left(doc_terms, term_id), lo + bisect_right(doc_terms, term_id)):
+                by_col.setdefault(self._cols[r], []).append((self._starts[r], self._ends[r]))
+        return {self._columns[col]: sorted(by_col[col]) for col in sorted(by_col)}
+
+    def __missing__(self, doc_id):
+        i = doc_id - self._base
+        if doc_id in self._dropped or not 0 <= i < len(self._ranges) - 1:
+            raise KeyError(doc_id)
+        if self._names is None:
+            self._names = {term_id: term for term, term_id in self._term_ids.items()}
+        terms = self._names
+        doc_offsets = {}
+        for r in range(self._ranges[i], self._ranges[i + 1]):
+            col_offsets = doc_offsets.setdefault(self._columns[self._cols[r]], {})
+            col_offsets.setdefault(terms[self._terms[r]], []).append((self._starts[r], self._ends[r]))
+        self[doc_id] = doc_offsets
+        return doc_offsets
+
+    def get(self, doc_id, default=None):
+        try:
+            return self[doc_id]
+        except KeyError:
+            return default
+
+    def pop(self, doc_id, *default):
+        self._dropped.add(doc_id)
+        return super().pop(doc_id, *default)
+
+
+def load_compiled(key, signature):
+    """(state, MappedSegment, MappedRows, MappedOffsets) of the compiled index
+    for key, if it was built from a file with this signature; None otherwise.
+    """
+    path = _compiled_path(key)
+    if path is None or not path.exists():
+        return None
+    with span("load_compiled", file=path.name):
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, meta_len = _HEADER.unpack_from(mapped, 0)
+            if magic != _MAGIC or version != COMPILED_VERSION:
+                return None
+            meta = json.loads(bytes(mapped[_HEADER.size:_HEADER.size + meta_len]))
+        except (OSError, ValueError, struct.error):
+            return None
+        if meta["key"] != _as_json(key) or meta["signature"] != _as_json(signature):
+            return None
+
+        buf = memoryview(mapped)
+        offset = _align(_HEADER.size + meta_len)
+        views = []
+        for count, code, size in ((meta["postings"], "i", 4), (meta["postings"], "i", 4),
+                                  (meta["span"], "i", 4), (meta["span"] + 1, "q", 8), (meta["span"] + 1, "q", 8),
+                                  (meta["records"], "i", 4), (meta["records"], "i", 4),
+                                  (meta["records"], "i", 4), (meta["records"], "i", 4)):
+            views.append(buf[offset:offset + count * size].cast(code))
+            offset += count * size
+        docs, tfs, lengths, row_offsets, ranges, rec_terms, rec_cols, rec_starts, rec_ends = views
+        blob = buf[offset:offset + meta["rows_len"]]
+
+    segment = MappedSegment(_MappedPostings(meta["terms"], docs, tfs),
+                            _MappedLengths(lengths, meta["base"], meta["docs"]))
+    offsets = MappedOffsets(ranges, rec_terms, rec_cols, rec_starts, rec_ends, meta["offset_terms"],
+                            meta["state"]["output_cols"], meta["base"])
+    return meta["state"], segment, MappedRows(row_offsets, blob, meta["base"]), offsets
+
+
+def save_compiled(key, signature, state, postings, lengths, rows, offsets):
+    """Write a compiled index atomically; a read-only cache is not an error.
+
+    postings is {term: [(doc_id, tf), ...]} sorted by doc id, lengths
+    {doc_id: token count}, rows {doc_id: row dict} and offsets
+    {doc_id: {column: {term: [(start, end), ...]}}}, all without tombstones.
+    """
+    path = _compiled_path(key)
+    if path is None:
+        return None
+    with span("save_compiled", file=path.name):
+        base = min(lengths) if lengths else 0
+        doc_span = max(lengths) - base + 1 if lengths else 0
+
+        terms = {}
+        docs = array("i")
+        tfs = array("i")
+        for term, entries in postings.items():
+            terms[term] = (len(docs), len(entries))
+            for doc_id, tf in entries:
+                docs.append(doc_id)
+                tfs.append(tf)
+        length_array = array("i", [-1]) * doc_span
+        for doc_id, length in lengths.items():
+            length_array[doc_id - base] = length
+        row_offsets = array("q", [0])
+        blob = bytearray()
+        for i in range(doc_span):
+            if length_array[i] >= 0:
+                blob += json.dumps(rows.get(base + i), ensure_ascii=False).encode("utf-8")
+            row_offsets.append(len(blob))
+
+        columns = {col: i for i, col in enumerate(state["output_cols"])}
+        offset_terms = {}
+        ranges = array("q", [0])
+        records = [array("i") for _ in range(4)]  # term id, column, start, end
+        for i in range(doc_span):
+            doc_records = []
+            if length_array[i] >= 0:
+                for col, term_offsets in offsets.get(base + i, {}).items():
+                    for term, spans in term_offsets.items():
+                        term_id = offset_terms.setdefault(term, len(offset_terms))
+                        doc_records.extend((term_id, columns[col], start, end) for start, end in spans)
+            doc_records.sort()
+            for record in doc_records:
+                for values, value in zip(records, record):
+                    values.append(value)
+            ranges.append(len(records[0]))
+
+        meta = json.dumps({
+            "key": key, "signature": signature, "state": state, "terms": terms,
+            "postings": len(docs), "base": base, "span": doc_span, "docs": len(lengths), "rows_len": len(blob),
+            "offset_terms": offset_terms, "records": len(records[0]),
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, COMPILED_VERSION, len(meta)))
+                f.write(meta)
+                f.write(b"\0" * (_align(_HEADER.size + len(meta)) - _HEADER.size - len(meta)))
+                for data in (docs, tfs, length_array, row_offsets, ranges, *records):
+                    f.write(data.tobytes())
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            return None
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    import core
+    # core imports this file as "compiler"; use that module's classes so
+    # errors raised through core.compile_index are caught below
+    from compiler import DatasetError, cache_dir, compile_csv
+
+    parser = argparse.ArgumentParser(description="UI Pro Max Dataset Compiler")
+    parser.add_argument("--check", action="store_true", help="Validate only, do not write compiled indexes")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    failed = bool(core.DATASET_ERRORS)
+    for error in core.DATASET_ERRORS:
+        report.setdefault("registry", {"errors": []})["errors"].append(error)
+    for name, config in core.dataset_configs():
+        filepath = core.DATA_DIR / config["file"]
+        try:
+            if args.check:
+                _, stats = compile_csv(filepath, config)
+            else:
+                _, stats = core.compile_index(filepath, config)
+            report[name] = stats
+        except (DatasetError, OSError) as e:
+            report[name] = {"error": str(e)}
+            failed = True
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        for name, stats in report.items():
+            if "errors" in stats:
+                for error in stats["errors"]:
+                    print(f"✗ {name}: {error}")
+            elif "error" in stats:
+                print(f"✗ {name}: {stats['error']}")
+            else:
+                print(f"✓ {name}: {stats['rows']} rows, {stats['duplicates']} duplicates dropped, "
+                      f"{stats['normalized_cells']} cells normalized, {stats['padded_rows']} short rows padded")
+        if not args.check and cache_dir() is not None:
+            print(f"\nCompiled indexes: {cache_dir() / 'compiled'}")
+    sys.exit(1 if failed else 0)
@@ -4,21 +4,32 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import base64
 import csv
+import hashlib
+import json
 import re
+import threading
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from compiler import DatasetError, TermOffsets, compile_csv, load_compiled, save_compiled
+from registry import discover
+from tracing import capture, span
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
+SNIPPET_CHARS = 300
 
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
         "search_cols": ["Style Category", "Keywords", "Best For", "Type", "AI Prompt Keywords"],
-        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity", "AI Prompt Keywords", "CSS/Technical Keywords", "Implementation Checklist", "Design System Variables"]
+        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity", "AI Prompt Keywords", "CSS/Technical Keywords", "Implementation Checklist", "Design System Variables"],
+        "filter_cols": ["Type", "Light Mode ✓", "Dark Mode ✓", "Mobile-Friendly", "Conversion-Focused", "Performance", "Complexity"]
     },
     "color": {
         "file": "colors.csv",
@@ -43,27 +54,32 @@ CSV_CONFIG = {
     "ux": {
         "file": "ux-guidelines.csv",
         "search_cols": ["Category", "Issue", "Description", "Platform"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "filter_cols": ["Category", "Platform", "Severity"]
     },
     "typography": {
         "file": "typography.csv",
         "search_cols": ["Font Pairing Name", "Category", "Mood/Style Keywords", "Best For", "Heading Font", "Body Font"],
-        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"]
+        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"],
+        "filter_cols": ["Category"]
     },
     "icons": {
         "file": "icons.csv",
         "search_cols": ["Category", "Icon Name", "Keywords", "Best For"],
-        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"]
+        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"],
+        "filter_cols": ["Category", "Library", "Style"]
     },
     "react": {
         "file": "react-performance.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "filter_cols": ["Category", "Severity"]
     },
     "web": {
         "file": "web-interface.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "filter_cols": ["Category", "Severity"]
     }
 }
 
@@ -86,11 +102,58 @@ STACK_CONFIG = {
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
+    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"],
+    "filter_cols": ["Category", "Severity"]
 }
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Keywords for domain auto-detection
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
+# Problems found while discovering registered datasets (see registry.py)
+DATASET_ERRORS = []
+
+
+def register_dataset(name, config, kind="domain"):
+    """Add a domain or stack dataset; config as in CSV_CONFIG / STACK_CONFIG.
+
+    Stacks fall back to the common stack columns; a domain's optional
+    "keywords" join domain auto-detection. "file" may be absolute.
+    """
+    if kind == "stack":
+        STACK_CONFIG[name] = config
+        if name not in AVAILABLE_STACKS:
+            AVAILABLE_STACKS.append(name)
+    elif kind == "domain":
+        CSV_CONFIG[name] = {key: value for key, value in config.items() if key != "keywords"}
+        if config.get("keywords"):
+            DOMAIN_KEYWORDS[name] = [kw.lower() for kw in config["keywords"]]
+    else:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+
+
+def _register_discovered():
+    """Register datasets from UIPRO_DATASETS directories and entry points"""
+    datasets, errors = discover()
+    for kind, name, config in datasets:
+        register_dataset(name, config, kind)
+    DATASET_ERRORS.extend(errors)
+
+
+_register_discovered()
+
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
@@ -113,137 +176,936 @@ class BM25:
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
+        with span("tokenize", docs=len(documents)):
+            self.corpus = [self.tokenize(doc) for doc in documents]
         self.N = len(self.corpus)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        with span("fit", docs=self.N):
+            self.doc_lengths = [len(doc) for doc in self.corpus]
+            self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+            for doc in self.corpus:
+                seen = set()
+                for word in doc:
+                    if word not in seen:
+                        self.doc_freqs[word] += 1
+                        seen.add(word)
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+            for word, freq in self.doc_freqs.items():
+                self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
     def score(self, query):
         """Score all documents against query"""
         query_tokens = self.tokenize(query)
         scores = []
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
+        with span("score", docs=self.N, terms=len(query_tokens)):
+            for idx, doc in enumerate(self.corpus):
+                score = 0
+                doc_len = self.doc_lengths[idx]
+                term_freqs = defaultdict(int)
+                for word in doc:
+                    term_freqs[word] += 1
+
+                for token in query_tokens:
+                    if token in self.idf:
+                        tf = term_freqs[token]
+                        idf = self.idf[token]
+                        numerator = tf * (self.k1 + 1)
+                        denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
+                        score += idf * numerator / denominator
+
+                scores.append((idx, score))
+
+        with span("sort", docs=len(scores)):
+            return sorted(scores, key=lambda x: x[1], reverse=True)
+
+
+# ============ INCREMENTAL INDEX ============
+MAX_SEGMENTS = 8
+RANKED_CACHE_SIZE = 64
+SHARD_MIN_DOCS = 20000  # below this, one process scores faster than the scatter-gather round trip
+
+# Leading status symbols used by categorical columns, with their filter aliases
+_FILTER_SYMBOLS = {"✓": "yes", "✗": "no", "◐": "partial", "⚡": "fast", "⚠": "moderate", "❌": "poor"}
+_FILTER_ALIASES = {"true": "yes", "y": "yes", "false": "no", "n": "no"}
+_FILTER_ALIASES.update(_FILTER_SYMBOLS)
+
+
+class FilterError(ValueError):
+    """Raised for filters on columns a dataset does not index"""
+
+
+class CursorError(ValueError):
+    """Raised for malformed cursors or cursors issued for another query"""
+
+
+def _filters_key(filters):
+    """Hashable, order-independent form of a filters dict"""
+    if not filters:
+        return ()
+    return tuple(sorted(
+        (name, tuple(sorted(str(v) for v in ([wanted] if isinstance(wanted, str) else wanted))))
+        for name, wanted in filters.items()
+    ))
+
+
+def _column_slug(column):
+    """'Light Mode ✓' -> 'light_mode', 'Mobile-Friendly' -> 'mobile_friendly'"""
+    return re.sub(r'[^a-z0-9]+', '_', column.lower()).strip('_')
+
+
+def _filter_values(value):
+    """Every filter value a categorical cell answers to.
+
+    '✓ Full (with adjustments)' matches 'yes', 'full' and the full text;
+    'Serif + Sans' matches 'serif' and 'sans'.
+    """
+    text = str(value).strip().lower()
+    values = {text}
+    if text[:1] in _FILTER_SYMBOLS:
+        values.add(_FILTER_SYMBOLS[text[0]])
+        text = text[1:].strip()
+        values.add(text)
+    words = re.findall(r'\w+', text)
+    if words:
+        values.add(words[0])
+    if "+" in text:
+        values.update(part.strip() for part in text.split("+") if part.strip())
+    values.discard("")
+    return values
+
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _term_offsets(text):
+    """term -> [(start, end), ...] character spans, using the BM25 tokenizer rules"""
+    offsets = {}
+    for match in _WORD_RE.finditer(text):
+        word = match.group().lower()
+        if len(word) > 2:
+            offsets.setdefault(word, []).append((match.start(), match.end()))
+    return offsets
+
+
+def _best_window(text, spans, width):
+    """Window of at most width chars covering the most spans, with relative highlights"""
+    if len(text) <= width:
+        return {"text": text, "start": 0, "end": len(text), "highlights": [[s, e] for s, e in spans]}
+
+    best_i, best_j = 0, 1
+    j = 1
+    for i in range(len(spans)):
+        j = max(j, i + 1)
+        while j < len(spans) and spans[j][1] - spans[i][0] <= width:
+            j += 1
+        if j - i > best_j - best_i:
+            best_i, best_j = i, j
+
+    first, last = spans[best_i][0], spans[best_j - 1][1]
+    pad = max(0, width - (last - first)) // 2
+    start = max(0, min(first - pad, len(text) - width))
+    end = min(len(text), start + width)
+    # Snap to word boundaries without cutting off the matches
+    if start > 0:
+        space = text.find(" ", start, first)
+        if space != -1:
+            start = space + 1
+    if end < len(text):
+        space = text.rfind(" ", last, end)
+        if space != -1:
+            end = space
+
+    highlights = [[s - start, e - start] for s, e in spans if s >= start and e <= end]
+    return {"text": text[start:end], "start": start, "end": end, "highlights": highlights}
+
+
+def estimate_tokens(text):
+    """Cheap LLM token estimate (~4 characters per token)"""
+    return (len(str(text)) + 3) // 4
+
+
+def _bitmap_members(bitmap):
+    """Decode an int bitmap into the set of doc_ids it holds"""
+    bits = bin(bitmap)[:1:-1]
+    return {i for i, bit in enumerate(bits) if bit == "1"}
+
+
+class _Segment:
+    """Immutable batch of postings; deletions are recorded as tombstones"""
+
+    __slots__ = ("postings", "lengths", "deleted")
+
+    def __init__(self):
+        self.postings = {}  # term -> {doc_id: tf}
+        self.lengths = {}  # doc_id -> token count
+        self.deleted = set()
+
+    def terms_of(self, doc_id):
+        """Unique terms of one document"""
+        return tuple(term for term, postings in self.postings.items() if doc_id in postings)
+
+
+class SearchIndex:
+    """Segmented inverted BM25 index with incremental add/update/delete by row key.
+
+    Scores match BM25.score exactly: df, N and the total document length are
+    kept up to date on every change, so idf and avgdl never need a rebuild.
+    """
+
+    tokenize = BM25.tokenize
+
+    def __init__(self, k1=1.5, b=0.75, filter_cols=(), output_cols=()):
+        self.k1 = k1
+        self.b = b
+        self.filter_cols = list(filter_cols)
+        self.bitmaps = {col: defaultdict(int) for col in self.filter_cols}  # column -> value -> doc_id bitmap
+        self.output_cols = list(output_cols)
+        self.offsets = TermOffsets()  # doc_id -> {column: {term: [(start, end), ...]}}, built with the document
+        self.cell_tokens = {}  # doc_id -> {column: estimated LLM tokens}
+        self.segments = []
+        self.doc_ids = {}  # row key -> doc_id
+        self.keys = {}  # doc_id -> row key
+        self.rows = {}  # doc_id -> row dict
+        self.hashes = {}  # doc_id -> row content hash
+        self.positions = {}  # doc_id -> position in source order (tie-break)
+        self.doc_terms = {}  # doc_id -> unique terms, for df bookkeeping on delete
+        self.doc_segment = {}  # doc_id -> owning segment
+        self.doc_freqs = defaultdict(int)
+        self.total_length = 0
+        self.N = 0
+        self._next_id = 0
+        self._ranked_cache = OrderedDict()  # (query tokens, filters) -> (ranking, total, complete)
+        self._lock = threading.RLock()  # ranked() may be called from executor threads (asearch)
+        self._sharded = None  # ShardedScorer snapshot, rebuilt after changes
+
+    # Rebuilt per process (or kept in the memory map) rather than persisted in compiled state
+    _TRANSIENT = ("segments", "doc_segment", "doc_terms", "rows", "offsets",
+                  "_ranked_cache", "_lock", "_sharded")
+    _INT_KEYED = ("cell_tokens", "keys", "hashes", "positions")  # doc_id -> value maps
+
+    def export(self):
+        """(state, postings, lengths, rows, offsets) for compiler.save_compiled, tombstones dropped"""
+        postings = {}
+        lengths = {}
+        for segment in self.segments:
+            for term, term_postings in segment.postings.items():
+                live = [(doc_id, tf) for doc_id, tf in term_postings.items() if doc_id not in segment.deleted]
+                if live:
+                    postings.setdefault(term, []).extend(live)
+            for doc_id, length in segment.lengths.items():
+                if doc_id not in segment.deleted:
+                    lengths[doc_id] = length
+        for entries in postings.values():
+            entries.sort()
+        state = {name: value for name, value in self.__dict__.items() if name not in self._TRANSIENT}
+        # JSON-safe: int-keyed maps as [key, value] pairs, bitmaps as hex (no int digit limit)
+        for name in self._INT_KEYED:
+            state[name] = list(state[name].items())
+        state["bitmaps"] = {col: {value: hex(bits) for value, bits in values.items()}
+                            for col, values in self.bitmaps.items()}
+        return state, postings, lengths, self.rows, self.offsets
+
+    @classmethod
+    def from_compiled(cls, state, segment, rows, offsets):
+        """Index over a memory-mapped compiled segment (see compiler.load_compiled)"""
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        for name in cls._INT_KEYED:
+            setattr(index, name, dict(state[name]))
+        index.bitmaps = {col: defaultdict(int, {value: int(bits, 16) for value, bits in values.items()})
+                         for col, values in state["bitmaps"].items()}
+        index.doc_freqs = defaultdict(int, state["doc_freqs"])
+        index.segments = [segment]
+        index.doc_segment = dict.fromkeys(index.keys, segment)
+        index.doc_terms = {}
+        index.rows = rows
+        index.offsets = offsets
+        index._ranked_cache = OrderedDict()
+        index._lock = threading.RLock()
+        index._sharded = None
+        return index
+
+    @property
+    def avgdl(self):
+        return self.total_length / self.N if self.N else 0
+
+    def idf(self, term):
+        """Inverse document frequency from the live df counts"""
+        freq = self.doc_freqs.get(term)
+        if not freq:
+            return None
+        return log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+
+    def add_documents(self, docs):
+        """Add [(key, text, row, row_hash, position), ...] as one new segment"""
+        if not docs:
+            return
+        self._invalidate()
+        segment = _Segment()
+        for key, text, row, row_hash, position in docs:
+            if key in self.doc_ids:
+                self.delete(key)
+            doc_id = self._next_id
+            self._next_id += 1
+
+            tokens = self.tokenize(text)
             term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+            for token in tokens:
+                term_freqs[token] += 1
+            for term, tf in term_freqs.items():
+                segment.postings.setdefault(term, {})[doc_id] = tf
+                self.doc_freqs[term] += 1
+            segment.lengths[doc_id] = len(tokens)
+            if row is not None:
+                bit = 1 << doc_id
+                for col in self.filter_cols:
+                    for value in _filter_values(row[col]):
+                        self.bitmaps[col][value] |= bit
+                self.cell_tokens[doc_id] = {col: estimate_tokens(row[col]) for col in self.output_cols}
+                self.offsets[doc_id] = {col: _term_offsets(row[col]) for col in self.output_cols if row[col]}
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+            self.doc_ids[key] = doc_id
+            self.keys[doc_id] = key
+            self.rows[doc_id] = row
+            self.hashes[doc_id] = row_hash
+            self.positions[doc_id] = position
+            self.doc_terms[doc_id] = tuple(term_freqs)
+            self.doc_segment[doc_id] = segment
+            self.total_length += len(tokens)
+            self.N += 1
+
+        self.segments.append(segment)
+        if len(self.segments) > MAX_SEGMENTS:
+            self.merge()
+
+    def add(self, key, text, row=None, row_hash=None, position=None):
+        """Add (or replace) a single document"""
+        self.add_documents([(key, text, row, row_hash, self._next_id if position is None else position)])
+
+    def update(self, key, text, row=None, row_hash=None, position=None):
+        """Replace a document; the old version is tombstoned"""
+        if position is None and key in self.doc_ids:
+            position = self.positions[self.doc_ids[key]]
+        self.add(key, text, row, row_hash, position)
+
+    def delete(self, key):
+        """Tombstone a document and remove it from the corpus statistics"""
+        doc_id = self.doc_ids.pop(key, None)
+        if doc_id is None:
+            return False
+        self._invalidate()
+        segment = self.doc_segment.pop(doc_id)
+        segment.deleted.add(doc_id)
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            terms = segment.terms_of(doc_id)
+        for term in terms:
+            self.doc_freqs[term] -= 1
+            if not self.doc_freqs[term]:
+                del self.doc_freqs[term]
+        self.total_length -= segment.lengths[doc_id]
+        self.N -= 1
+        row = self.rows.get(doc_id)
+        if row is not None:
+            mask = ~(1 << doc_id)
+            for col in self.filter_cols:
+                bitmaps = self.bitmaps[col]
+                for value in _filter_values(row[col]):
+                    bitmaps[value] &= mask
+                    if not bitmaps[value]:
+                        del bitmaps[value]
+        for mapping in (self.keys, self.rows, self.hashes, self.positions, self.offsets, self.cell_tokens):
+            mapping.pop(doc_id, None)
+        return True
+
+    def merge(self):
+        """Fold all segments into one, dropping tombstoned postings"""
+        merged = _Segment()
+        for segment in self.segments:
+            for term, postings in segment.postings.items():
+                live = {d: tf for d, tf in postings.items() if d not in segment.deleted}
+                if live:
+                    merged.postings.setdefault(term, {}).update(live)
+            for doc_id, length in segment.lengths.items():
+                if doc_id not in segment.deleted:
+                    merged.lengths[doc_id] = length
+        for doc_id in merged.lengths:
+            self.doc_segment[doc_id] = merged
+        self.segments = [merged]
+
+    def sync(self, docs):
+        """Bring the index in line with [(key, text, row, row_hash), ...] in source order.
+
+        Unchanged rows are left alone, edited rows are replaced, new rows are
+        added and rows missing from docs are deleted.
+        """
+        seen = set()
+        changed = []
+        for position, (key, text, row, row_hash) in enumerate(docs):
+            seen.add(key)
+            doc_id = self.doc_ids.get(key)
+            if doc_id is not None and self.hashes[doc_id] == row_hash:
+                self.positions[doc_id] = position
+                self.rows[doc_id] = row
+            else:
+                changed.append((key, text, row, row_hash, position))
+        for key in [k for k in self.doc_ids if k not in seen]:
+            self.delete(key)
+        self.add_documents(changed)
+        return len(changed)
+
+    def snippets(self, doc_id, query_tokens, width=SNIPPET_CHARS):
+        """Best-matching window and highlight offsets per matching field.
+
+        Term offsets are recorded when a document is indexed (and stored in
+        the compiled index), so this costs O(matches) rather than a rescan
+        of the text.
+        """
+        row = self.rows[doc_id]
+        return {col: _best_window(row[col], spans, width)
+                for col, spans in self.offsets.spans(doc_id, set(query_tokens)).items()}
+
+    def resolve_column(self, name):
+        """Map a filter name ('dark_mode' or 'Dark Mode ✓') to an indexed column"""
+        for col in self.filter_cols:
+            if name == col or _column_slug(name) == _column_slug(col):
+                return col
+        available = ", ".join(_column_slug(col) for col in self.filter_cols) or "none"
+        raise FilterError(f"Unknown filter column: {name}. Available: {available}")
+
+    def _invalidate(self):
+        """Drop cached rankings and the shard snapshot after a change"""
+        self._ranked_cache.clear()
+        if self._sharded is not None:
+            self._sharded.close()
+            self._sharded = None
+
+    def match(self, filters):
+        """Doc ids passing {column: value | [values]} (AND across columns, OR within)"""
+        return _bitmap_members(self.match_bitmap(filters))
+
+    def match_bitmap(self, filters):
+        """match() as an int bitmap of doc ids"""
+        bitmap = None
+        for name, wanted in filters.items():
+            col = self.resolve_column(name)
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            column_bitmap = 0
+            for value in wanted:
+                value = str(value).strip().lower()
+                value = _FILTER_ALIASES.get(value, value)
+                column_bitmap |= self.bitmaps[col].get(value, 0)
+            bitmap = column_bitmap if bitmap is None else bitmap & column_bitmap
+        return bitmap or 0
+
+    def score(self, query, filters=None):
+        """Score documents containing any query term, sorted like BM25.score.
+
+        With filters, only documents in the intersected column bitmaps are scored.
+        """
+        return self.score_tokens(self.tokenize(query), filters)
+
+    def ranked(self, query_tokens, filters=None, limit=None, stats=None):
+        """Ranking (score > 0) for a tokenized query, cached until the index changes.
 
-            scores.append((idx, score))
+        Returns (ranking, total matches). ranking holds at least the best
+        limit documents (all of them when limit is None or the index is not
+        sharded), so later pages of the same query are a slice of the cache.
+        stats, if given, is filled with this call's scoring counters.
+        """
+        key = (tuple(query_tokens), _filters_key(filters))
+        with self._lock:
+            entry = self._ranked_cache.get(key)
+            cached = entry is not None and (entry[2] or (limit is not None and len(entry[0]) >= limit))
+            if cached:
+                self._ranked_cache.move_to_end(key)
+            else:
+                entry = self._rank(query_tokens, filters, limit)
+                self._ranked_cache[key] = entry
+                if len(self._ranked_cache) > RANKED_CACHE_SIZE:
+                    self._ranked_cache.popitem(last=False)
+        if stats is not None:
+            stats.update(entry[3], cached=cached)
+        return entry[0], entry[1]
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    def _rank(self, query_tokens, filters, limit):
+        """(ranking, total, complete, stats) from the shard workers or in-process scoring"""
+        workers = 1
+        if self.N >= SHARD_MIN_DOCS:
+            # multiprocessing is slow to import; only large indexes pay for it
+            from shards import ShardedScorer, default_workers
+            workers = default_workers()
+        if workers < 2:
+            stats = {}
+            ranking = [(doc_id, score) for doc_id, score in self.score_tokens(query_tokens, filters, stats) if score > 0]
+            return ranking, len(ranking), True, stats
+
+        allowed = None
+        if filters:
+            with span("filter", filters=len(filters)):
+                allowed = self.match_bitmap(filters)
+            if not allowed:
+                return [], 0, True, {"docs_total": self.N, "docs_scored": 0, "docs_skipped": self.N}
+        if self._sharded is None:
+            with span("shard_build", docs=self.N, workers=workers):
+                self._sharded = ShardedScorer(self, workers=workers)
+        query = [(token, self.idf(token)) for token in query_tokens if self.idf(token) is not None]
+        with span("shard_score", shards=len(self._sharded.blocks), terms=len(query)):
+            ranking, total, counters = self._sharded.ranked(query, allowed, limit)
+        stats = dict(counters, docs_total=self.N, docs_scored=total, docs_skipped=self.N - total,
+                     terms=len(query_tokens), terms_missing=len(query_tokens) - len(query), shards=len(self._sharded.blocks))
+        return ranking, total, len(ranking) == total, stats
+
+    def explain(self, doc_id, query_tokens):
+        """Per-term BM25 breakdown of one document's score, in query order.
+
+        length_norm is (1 - b + b * dl / avgdl); each contribution is
+        idf * tf * (k1 + 1) / (tf + k1 * length_norm) and they sum to the score.
+        """
+        segment = self.doc_segment[doc_id]
+        length = segment.lengths[doc_id]
+        avgdl = self.avgdl
+        length_norm = 1 - self.b + self.b * length / avgdl
+        terms = []
+        for token in query_tokens:
+            tf = segment.postings.get(token, {}).get(doc_id, 0)
+            idf = self.idf(token)
+            contribution = 0.0
+            if tf and idf is not None:
+                numerator = tf * (self.k1 + 1)
+                denominator = tf + self.k1 * (1 - self.b + self.b * length / avgdl)
+                contribution = idf * numerator / denominator
+            terms.append({"term": token, "tf": tf, "idf": idf or 0.0, "length_norm": length_norm, "contribution": contribution})
+        return {"doc_length": length, "terms": terms}
+
+    def score_tokens(self, query_tokens, filters=None, stats=None):
+        """score() for an already tokenized query, so one query can hit many indexes.
+
+        stats, if given, is filled with counters: postings read and skipped
+        (tombstoned or filtered out), query terms missing from the index, and
+        documents scored versus never touched.
+        """
+        scores = defaultdict(float)
+        avgdl = self.avgdl
+        allowed = None
+        missing = postings_read = skipped_deleted = skipped_filtered = 0
+        if stats is None:
+            stats = {}
+        stats.update(docs_total=self.N, docs_scored=0, docs_skipped=self.N, terms=len(query_tokens))
+        if filters:
+            with span("filter", filters=len(filters)):
+                allowed = self.match(filters)
+            if not allowed:
+                return []
+
+        with span("score", docs=self.N, terms=len(query_tokens)):
+            for token in query_tokens:
+                idf = self.idf(token)
+                if idf is None:
+                    missing += 1
+                    continue
+                for segment in self.segments:
+                    postings = segment.postings.get(token)
+                    if not postings:
+                        continue
+                    deleted = segment.deleted
+                    lengths = segment.lengths
+                    postings_read += len(postings)
+                    for doc_id, tf in postings.items():
+                        if deleted and doc_id in deleted:
+                            skipped_deleted += 1
+                            continue
+                        if allowed is not None and doc_id not in allowed:
+                            skipped_filtered += 1
+                            continue
+                        numerator = tf * (self.k1 + 1)
+                        denominator = tf + self.k1 * (1 - self.b + self.b * lengths[doc_id] / avgdl)
+                        scores[doc_id] += idf * numerator / denominator
+
+        stats.update(docs_scored=len(scores), docs_skipped=self.N - len(scores), terms_missing=missing,
+                     postings_read=postings_read, skipped_deleted=skipped_deleted,
+                     skipped_filtered=skipped_filtered, segments=len(self.segments))
+        with span("sort", docs=len(scores)):
+            positions = self.positions
+            return sorted(scores.items(), key=lambda x: (-x[1], positions[x[0]]))
 
 
 # ============ SEARCH FUNCTIONS ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    with span("csv_load", file=Path(filepath).name):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+
+def _row_hash(row):
+    """Content hash of a CSV row, used to detect edited rows"""
+    return hashlib.blake2b("\x1f".join(str(v) for v in row.values()).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _row_docs(data, search_cols):
+    """(key, text, row, row_hash) per compiled row; the key is the "No" column or the row hash"""
+    docs = []
+    seen = set()
+    for row in data:
+        row_hash = _row_hash(row)
+        key = row.get("No") or row_hash
+        if key in seen:
+            key = row_hash
+        seen.add(key)
+        text = " ".join(row[col] for col in search_cols)
+        docs.append((key, text, row, row_hash))
+    return docs
+
+
+def dataset_configs():
+    """Every searchable dataset as (name, config); stack names are "stack:<name>" """
+    for name, config in CSV_CONFIG.items():
+        yield name, config
+    for name in STACK_CONFIG:
+        yield f"stack:{name}", _stack_config(name)
+
+
+def _stack_config(stack):
+    """A stack's config with the common stack columns filled in"""
+    return dict(_STACK_COLS, **STACK_CONFIG[stack])
+
+
+def _file_signature(filepath):
+    """(mtime_ns, size) of a dataset file"""
+    stat = filepath.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _index_key(filepath, config):
+    """Cache key of the index for one dataset file and column config"""
+    return (str(filepath), tuple(config["search_cols"]), tuple(config.get("filter_cols", ())), tuple(config["output_cols"]))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+def compile_index(filepath, config, index=None):
+    """Validate a dataset, sync it into index (a new one by default) and
+    write the compiled index to disk, returns (index, stats).
+    """
+    signature = _file_signature(filepath)
+    rows, stats = compile_csv(filepath, config)
+    incremental = index is not None
+    if index is None:
+        index = SearchIndex(filter_cols=config.get("filter_cols", ()), output_cols=config["output_cols"])
+    with span("index_sync", file=filepath.name, incremental=incremental):
+        index.sync(_row_docs(rows, config["search_cols"]))
+    save_compiled(_index_key(filepath, config), signature, *index.export())
+    return index, stats
+
+
+# (filepath, search_cols, filter_cols, output_cols) -> (file signature, SearchIndex)
+_INDEX_CACHE = {}
+_INDEX_LOCKS = {}  # cache key -> lock, so concurrent callers load or compile an index once
+
+
+def _get_index(filepath, config):
+    """Return the index for a CSV: in-process cache, then the compiled index
+    on disk, then a fresh compile (applying only the rows that changed when
+    this process already holds an older index).
+    """
+    signature = _file_signature(filepath)
+    cache_key = _index_key(filepath, config)
+    cached = _INDEX_CACHE.get(cache_key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with _INDEX_LOCKS.setdefault(cache_key, threading.Lock()):
+        cached = _INDEX_CACHE.get(cache_key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        compiled = load_compiled(cache_key, signature)
+        index = SearchIndex.from_compiled(*compiled) if compiled else None
+        if index is None:
+            index, _ = compile_index(filepath, config, cached[1] if cached else None)
+        _INDEX_CACHE[cache_key] = (signature, index)
+    return index
+
+
+def _rank_csv(filepath, config, query, max_results, filters=None):
+    """Rank CSV rows with BM25, returns (index, [(doc_id, score), ...]) with score > 0"""
+    index = _get_index(filepath, config)
+    ranking, _ = index.ranked(index.tokenize(query), filters, max_results)
+    return index, ranking[:max_results]
+
+
+def _query_fingerprint(scope, query_tokens, filters):
+    """Short hash tying a cursor to one dataset, normalized query and filter set"""
+    payload = json.dumps([scope, list(query_tokens), _filters_key(filters)], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def _encode_cursor(offset, fingerprint):
+    """Opaque cursor for the page starting at offset"""
+    raw = json.dumps({"o": offset, "q": fingerprint}, separators=(",", ":")).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+
+def _decode_cursor(cursor, fingerprint):
+    """Offset encoded in a cursor, checked against the current query"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset = int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        raise CursorError(f"Invalid cursor: {cursor}")
+    if data.get("q") != fingerprint:
+        raise CursorError("Cursor was issued for a different query, domain or filter set")
+    return max(0, offset)
+
+
+def _search_csv(filepath, config, query, max_results, filters=None, snippets=False, token_budget=None,
+                offset=0, cursor=None, scope=None, explain=False):
+    """Core search function using BM25, returns (results, extras).
+
+    extras holds the pagination fields (offset, total, next_cursor) plus
+    "snippets", "budget" and/or "explain" when those were requested.
+    """
     if not filepath.exists():
-        return []
+        return [], {}
+
+    index = _get_index(filepath, config)
+    query_tokens = index.tokenize(query)
+    fingerprint = _query_fingerprint(scope or config.get("file"), query_tokens, filters)
+    if cursor:
+        offset = _decode_cursor(cursor, fingerprint)
+
+    stats = {}
+    ranking, total = index.ranked(query_tokens, filters, offset + max_results, stats)
+    ranked = ranking[offset:offset + max_results]
+    extras = {"offset": offset, "total": total}
+    if explain:
+        extras["explain"] = _explain(index, ranked, query_tokens, stats)
+    if token_budget is not None:
+        results, extras["budget"] = _pack(index, ranked, config["output_cols"], query_tokens, token_budget)
+    else:
+        results = _project(index, ranked, config["output_cols"])
+        if snippets:
+            extras["snippets"] = _snippets(index, ranked, query_tokens)
+    # Packed pages are a prefix of the ranked slice; the next page starts after
+    # the last result shown (or skips a lone result too large for the budget)
+    next_offset = offset + max(len(results), 1 if ranked else 0)
+    extras["next_cursor"] = _encode_cursor(next_offset, fingerprint) if next_offset < total else None
+    return results, extras
+
+
+def _explain(index, ranked, query_tokens, stats):
+    """Scoring counters and per-term score breakdown of the ranked documents"""
+    return {
+        "query_tokens": query_tokens,
+        "k1": index.k1,
+        "b": index.b,
+        "avgdl": index.avgdl,
+        "stats": stats,
+        "results": [dict(index.explain(doc_id, query_tokens), score=score) for doc_id, score in ranked],
+    }
 
-    data = _load_csv(filepath)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+def _phase_timings(events):
+    """{span name: total ms} from captured trace events, in order of first finish"""
+    timings = {}
+    for event in events:
+        timings[event["name"]] = round(timings.get(event["name"], 0.0) + event["dur"] / 1000, 3)
+    return timings
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
+def _project(index, ranked, output_cols):
+    """Project ranked documents onto the output columns"""
     results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    with span("project", rows=len(ranked)):
+        for doc_id, score in ranked:
+            row = index.rows[doc_id]
+            results.append({col: row[col] for col in output_cols})
 
     return results
 
 
+def _snippets(index, ranked, query_tokens):
+    """Per-result {column: best window} for ranked documents"""
+    with span("snippets", rows=len(ranked)):
+        return [index.snippets(doc_id, query_tokens) for doc_id, _ in ranked]
+
+
+def _field_overhead(col):
+    """Tokens spent on the '- **Column:** ' label of a formatted field"""
+    return estimate_tokens(f"- **{col}:** ")
+
+
+def _pack(index, ranked, output_cols, query_tokens, budget):
+    """Greedily fit ranked results into a token budget, returns (results, budget_info).
+
+    Pass 1 walks results in rank order and takes each result's first column,
+    then every field that matched the query and still fits (long matches as
+    their best window); it stops at the first result that does not fit, so
+    the packed results are always a prefix of ranked and paging can resume
+    right after them. Pass 2 spends what is left on the remaining fields,
+    again in rank order. Costs come from the per-cell estimates in the index.
+    """
+    groups, info = _pack_groups([(index, ranked, output_cols)], query_tokens, budget)
+    return groups[0], info
+
+
+def _pack_groups(groups, query_tokens, budget):
+    """_pack() over several [(index, ranked, output_cols), ...] sharing one budget.
+
+    Results are visited round-robin by rank (every group's first result, then
+    every second result, ...), so groups without hits leave their share to
+    the ones that match. Returns ([results per group], budget_info).
+    """
+    with span("pack", rows=sum(len(ranked) for _, ranked, _ in groups), budget=budget):
+        used = 0
+        packed = []  # (group, cols, fields, chosen) in visiting order
+        depth = max((len(ranked) for _, ranked, _ in groups), default=0)
+        for rank in range(depth):
+            for group, (index, ranked, output_cols) in enumerate(groups):
+                if rank >= len(ranked):
+                    continue
+                doc_id = ranked[rank][0]
+                row = index.rows[doc_id]
+                costs = index.cell_tokens[doc_id]
+                windows = index.snippets(doc_id, query_tokens)
+                cols = output_cols
+                fields = {}
+                for col in cols:
+                    value, cost = row[col], costs[col]
+                    window = windows.get(col)
+                    if window and cost > estimate_tokens(window["text"]):
+                        value = ("..." if window["start"] > 0 else "") + window["text"] + ("..." if window["end"] < len(row[col]) else "")
+                        cost = estimate_tokens(value)
+                    fields[col] = (value, cost + _field_overhead(col), bool(window))
+                packed.append((group, cols, fields, {}))
+
+        # Pass 1: identifying column + matched fields, best results first;
+        # a group stops at its first result that does not fit
+        header = estimate_tokens("### Result 10\n")
+        stopped = set()
+        for group, cols, fields, chosen in packed:
+            if group in stopped:
+                continue
+            if not cols or used + header + fields[cols[0]][1] > budget:
+                stopped.add(group)
+                continue
+            used += header + fields[cols[0]][1]
+            chosen[cols[0]] = fields[cols[0]][0]
+            for col in cols[1:]:
+                if fields[col][2] and used + fields[col][1] <= budget:
+                    used += fields[col][1]
+                    chosen[col] = fields[col][0]
+
+        # Pass 2: remaining fields of results that made it in
+        for _, cols, fields, chosen in packed:
+            if not chosen:
+                continue
+            for col in cols:
+                if col not in chosen and used + fields[col][1] <= budget:
+                    used += fields[col][1]
+                    chosen[col] = fields[col][0]
+
+        results = [[] for _ in groups]
+        for group, cols, _, chosen in packed:
+            if chosen:
+                results[group].append({col: chosen[col] for col in cols if col in chosen})
+        omitted = sum(len(cols) - len(chosen) for _, cols, _, chosen in packed)
+        return results, {"limit": budget, "used": used, "omitted_fields": omitted}
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
     query_lower = query.lower()
 
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
-
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
+    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in DOMAIN_KEYWORDS.items()}
     best = max(scores, key=scores.get)
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def _limits_error(max_results, token_budget):
+    """Error message for a page size or token budget that could never return a result"""
+    if max_results < 1:
+        return f"max_results must be >= 1, got {max_results}"
+    if token_budget is not None and token_budget < 1:
+        return f"token_budget must be >= 1, got {token_budget}"
+    return None
+
+
+def search(query, domain=None, max_results=MAX_RESULTS, filters=None, snippets=False, token_budget=None,
+           offset=0, cursor=None, explain=False):
+    """Main search function with auto-domain detection.
+
+    filters: optional {column: value | [values]} on the domain's filter_cols,
+    e.g. {"severity": "high"} or {"dark_mode": "yes", "complexity": ["low", "medium"]}
+    snippets: also return, per result, the best-matching window of each field
+    that matched the query ({"text", "start", "end", "highlights"})
+    token_budget: pack the best results and fields into about this many LLM
+    tokens, preferring fields that matched the query (adds a "budget" entry)
+    offset / cursor: page through the ranking; every response carries
+    "offset", "total" and "next_cursor" (None on the last page). Pages after
+    the first are served from the cached ranking of the normalized query.
+    explain: add an "explain" entry with per-term tf / idf / length norm
+    contributions per result, scoring counters and per-phase timings (ms)
+    """
     if domain is None:
         domain = detect_domain(query)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
 
+    error = _limits_error(max_results, token_budget)
+    if error:
+        return {"error": error, "domain": domain}
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    try:
+        with capture() if explain else nullcontext() as events:
+            with span("search", domain=domain, query=query):
+                results, extras = _search_csv(filepath, config, query, max_results, filters, snippets, token_budget,
+                                              offset, cursor, scope=domain, explain=explain)
+    except (FilterError, CursorError, DatasetError) as e:
+        return {"error": str(e), "domain": domain}
 
-    return {
+    result = {
         "domain": domain,
         "query": query,
         "file": config["file"],
         "count": len(results),
         "results": results
     }
+    result.update(extras)
+    if explain:
+        result["explain"]["timings"] = _phase_timings(events)
+    return result
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
+def search_stack(query, stack, max_results=MAX_RESULTS, filters=None, snippets=False, token_budget=None,
+                 offset=0, cursor=None, explain=False):
+    """Search stack-specific guidelines (filters, snippets, token_budget, paging and explain as in search())"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
     filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
 
+    error = _limits_error(max_results, token_budget)
+    if error:
+        return {"error": error, "stack": stack}
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    try:
+        with capture() if explain else nullcontext() as events:
+            with span("search_stack", stack=stack, query=query):
+                results, extras = _search_csv(filepath, _stack_config(stack), query, max_results, filters, snippets,
+                                              token_budget, offset, cursor, scope=f"stack:{stack}", explain=explain)
+    except (FilterError, CursorError, DatasetError) as e:
+        return {"error": str(e), "stack": stack}
 
-    return {
+    result = {
         "domain": "stack",
         "stack": stack,
         "query": query,
@@ -251,3 +1113,90 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+    result.update(extras)
+    if explain:
+        result["explain"]["timings"] = _phase_timings(events)
+    return result
+
+
+def search_stacks(query, stacks="all", max_results=MAX_RESULTS, filters=None, snippets=False, token_budget=None):
+    """Search several stacks in one call, returning aligned per-stack top-k results.
+
+    The query is tokenized once and scored against every stack's cached index;
+    each stack keeps its own corpus statistics, so per-stack rankings are the
+    same as search_stack(). A token_budget is shared by all stacks: results are
+    packed round-robin by rank, so stacks without hits cost nothing.
+    """
+    if stacks == "all":
+        stacks = AVAILABLE_STACKS
+    stacks = list(stacks)
+    unknown = [stack for stack in stacks if stack not in STACK_CONFIG]
+    if unknown:
+        return {"error": f"Unknown stack: {', '.join(unknown)}. Available: {', '.join(AVAILABLE_STACKS)}"}
+    error = _limits_error(max_results, token_budget)
+    if error:
+        return {"error": error, "stacks": stacks}
+
+    indexes = []
+    for stack in stacks:
+        filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+        if not filepath.exists():
+            return {"error": f"Stack file not found: {filepath}", "stack": stack}
+        try:
+            config = _stack_config(stack)
+            indexes.append((stack, config, _get_index(filepath, config)))
+        except DatasetError as e:
+            return {"error": str(e), "stack": stack}
+
+    results = {}
+    windows = {}
+    budget = None
+    try:
+        with span("search_stacks", stacks=len(stacks), query=query):
+            query_tokens = indexes[0][2].tokenize(query) if indexes else []
+            groups = []
+            for stack, config, index in indexes:
+                ranked = index.ranked(query_tokens, filters, max_results)[0][:max_results]
+                if token_budget is not None:
+                    groups.append((index, ranked, config["output_cols"]))
+                    continue
+                results[stack] = _project(index, ranked, config["output_cols"])
+                if snippets:
+                    windows[stack] = _snippets(index, ranked, query_tokens)
+            if token_budget is not None:
+                packed, budget = _pack_groups(groups, query_tokens, token_budget)
+                results = dict(zip(stacks, packed))
+    except FilterError as e:
+        return {"error": str(e), "stacks": stacks}
+
+    result = {
+        "domain": "stack",
+        "stacks": stacks,
+        "query": query,
+        "files": {stack: STACK_CONFIG[stack]["file"] for stack in stacks},
+        "count": sum(len(rows) for rows in results.values()),
+        "results": results
+    }
+    if snippets and token_budget is None:
+        result["snippets"] = windows
+    if budget is not None:
+        result["budget"] = budget
+    return result
+
+
+# ============ ASYNC API ============
+async def _run(func, *args, **kwargs):
+    """Run a blocking search call on the loop's default executor"""
+    import asyncio  # only async callers pay for the import; search.py never loads it
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+
+async def asearch(query, domain=None, max_results=MAX_RESULTS, **kwargs):
+    """search() for asyncio callers; index loads and scoring run off the event loop"""
+    return await _run(search, query, domain, max_results, **kwargs)
+
+
+async def asearch_stack(query, stack, max_results=MAX_RESULTS, **kwargs):
+    """search_stack() for asyncio callers"""
+    return await _run(search_stack, query, stack, max_results, **kwargs)
@@ -11,6 +11,9 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+
+    # From asyncio code (domain searches run concurrently)
+    result = await agenerate_design_system("SaaS dashboard", "My Project")
 """
 
 import csv
@@ -18,7 +21,8 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, asearch, DATA_DIR
+from tracing import span
 
 
 # ============ CONFIGURATION ============
@@ -45,21 +49,34 @@ class DesignSystemGenerator:
         filepath = DATA_DIR / REASONING_FILE
         if not filepath.exists():
             return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+        with span("csv_load", file=REASONING_FILE):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    def _domain_queries(self, query: str, style_priority: list = None) -> dict:
+        """Map each domain to its (query, max_results) for the multi-domain search."""
+        queries = {}
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                priority_query = " ".join(style_priority[:2])
+                queries[domain] = (f"{query} {priority_query}", config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                queries[domain] = (query, config["max_results"])
+        return queries
+
+    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
+        """Execute searches across multiple domains."""
+        return {domain: search(domain_query, domain, max_results)
+                for domain, (domain_query, max_results) in self._domain_queries(query, style_priority).items()}
+
+    async def _amulti_domain_search(self, query: str, style_priority: list = None) -> dict:
+        """Execute searches across multiple domains concurrently."""
+        import asyncio  # kept out of the sync path's startup
+        queries = self._domain_queries(query, style_priority)
+        results = await asyncio.gather(*(asearch(domain_query, domain, max_results)
+                                         for domain, (domain_query, max_results) in queries.items()))
+        return dict(zip(queries, results))
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
@@ -160,30 +177,56 @@ class DesignSystemGenerator:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
-    def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+    def _category_reasoning(self, product_result: dict) -> tuple:
+        """Product category and its reasoning rules from the product search."""
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
+        with span("generate.reasoning_lookup", category=category):
+            reasoning = self._apply_reasoning(category, {})
+        return category, reasoning
+
+    def generate(self, query: str, project_name: str = None) -> dict:
+        """Generate complete design system recommendation."""
+        # Step 1: First search product to get category
+        with span("generate.product_search", query=query):
+            product_result = search(query, "product", 1)
+
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
-        style_priority = reasoning.get("style_priority", [])
+        category, reasoning = self._category_reasoning(product_result)
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
+        with span("generate.multi_domain_search"):
+            search_results = self._multi_domain_search(query, reasoning.get("style_priority", []))
         search_results["product"] = product_result  # Reuse product search
 
+        return self._compose(query, project_name, category, reasoning, search_results)
+
+    async def agenerate(self, query: str, project_name: str = None) -> dict:
+        """generate() with the domain searches awaited concurrently."""
+        with span("generate.product_search", query=query):
+            product_result = await asearch(query, "product", 1)
+
+        category, reasoning = self._category_reasoning(product_result)
+
+        with span("generate.multi_domain_search"):
+            search_results = await self._amulti_domain_search(query, reasoning.get("style_priority", []))
+        search_results["product"] = product_result  # Reuse product search
+
+        return self._compose(query, project_name, category, reasoning, search_results)
+
+    def _compose(self, query: str, project_name: str, category: str, reasoning: dict, search_results: dict) -> dict:
+        """Build the recommendation from reasoning rules and domain search results."""
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
         color_results = self._extract_results(search_results.get("color", {}))
         typography_results = self._extract_results(search_results.get("typography", {}))
         landing_results = self._extract_results(search_results.get("landing", {}))
 
-        best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
+        with span("generate.select_best_match"):
+            best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
         best_color = color_results[0] if color_results else {}
         best_typography = typography_results[0] if typography_results else {}
         best_landing = landing_results[0] if landing_results else {}
@@ -475,16 +518,47 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
-    
-    # Persist to files if requested
-    if persist:
-        persist_design_system(design_system, page, output_dir, query)
+    with span("generate_design_system", query=query):
+        generator = DesignSystemGenerator()
+        with span("generate"):
+            design_system = generator.generate(query, project_name)
+
+        # Persist to files if requested
+        if persist:
+            with span("persist"):
+                persist_design_system(design_system, page, output_dir, query)
+
+        return _format(design_system, output_format)
+
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+async def agenerate_design_system(query: str, project_name: str = None, output_format: str = "ascii",
+                                  persist: bool = False, page: str = None, output_dir: str = None) -> str:
+    """
+    generate_design_system() for asyncio callers.
+
+    Searches run on the event loop's default executor and the per-domain
+    lookups are gathered concurrently; the output is the same as the sync
+    version's.
+    """
+    import asyncio  # kept out of the sync path's startup
+    loop = asyncio.get_running_loop()
+    with span("generate_design_system", query=query):
+        generator = await loop.run_in_executor(None, DesignSystemGenerator)  # reads ui-reasoning.csv
+        with span("generate"):
+            design_system = await generator.agenerate(query, project_name)
+        if persist:
+            with span("persist"):
+                await loop.run_in_executor(None, persist_design_system, design_system, page, output_dir, query)
+
+        return _format(design_system, output_format)
+
+
+def _format(design_system: dict, output_format: str) -> str:
+    """Render a generated design system as "ascii" or "markdown"."""
+    with span("format", output_format=output_format):
+        if output_format == "markdown":
+            return format_markdown(design_system)
+        return format_ascii_box(design_system)
 
 
 # ============ PERSISTENCE FUNCTIONS ============
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Dataset Registry - Discovers datasets beyond the bundled data/
+
+Sources:
+  - directories listed in UIPRO_DATASETS (separated like PATH)
+  - installed packages with a "uipro.datasets" entry point that resolves to
+    such a directory (a str/Path, or a callable returning one)
+
+Each directory holds a datasets.json manifest; file paths are relative to it:
+
+    {
+      "domains": {
+        "brand": {
+          "file": "brand.csv",
+          "search_cols": ["Component", "Keywords"],
+          "output_cols": ["Component", "Guideline", "Example"],
+          "filter_cols": ["Platform"],
+          "keywords": ["brand", "acme"]
+        }
+      },
+      "stacks": {
+        "angular": {"file": "angular.csv"}
+      }
+    }
+
+Domains need file, search_cols and output_cols; "keywords" feed domain
+auto-detection. Stacks default to the bundled stack columns. Registered
+datasets go through the same compiler, compiled-index cache and search path
+as the bundled ones.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from compiler import DatasetError, cache_dir
+
+DATASETS_ENV = "UIPRO_DATASETS"
+ENTRY_POINT_GROUP = "uipro.datasets"
+MANIFEST = "datasets.json"
+REQUIRED_KEYS = ("file", "search_cols", "output_cols")
+
+
+def load_manifest(directory):
+    """[(kind, name, config), ...] from a dataset directory, kind is "domain" or "stack" """
+    directory = Path(directory).expanduser().resolve()
+    path = directory / MANIFEST
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise DatasetError(f"{path}: {e}")
+
+    datasets = []
+    for kind, section in (("domain", "domains"), ("stack", "stacks")):
+        for name, config in manifest.get(section, {}).items():
+            required = REQUIRED_KEYS if kind == "domain" else ("file",)
+            missing = [key for key in required if key not in config]
+            if missing:
+                raise DatasetError(f"{path}: {section}.{name} is missing {', '.join(missing)}")
+            config = dict(config, file=str(directory / config["file"]))
+            datasets.append((kind, name, config))
+    return datasets
+
+
+def _path_signature():
+    """mtimes of sys.path entries; changes when packages are installed or removed"""
+    signature = []
+    for entry in sys.path:
+        try:
+            signature.append([entry, os.stat(entry or ".").st_mtime_ns])
+        except OSError:
+            continue
+    return signature
+
+
+def entry_point_dirs():
+    """Directories exposed through entry points, cached per sys.path state.
+
+    Scanning installed distributions costs more than a whole search, so the
+    resolved directories are kept in the cache dir until sys.path changes.
+    """
+    signature = _path_signature()
+    directory = cache_dir()
+    cache_file = None
+    if directory is not None:
+        path_key = hashlib.blake2b(repr(sys.path).encode("utf-8"), digest_size=6).hexdigest()
+        cache_file = directory / f"entry-points-{path_key}.json"
+    if cache_file is not None:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("signature") == signature:
+                return cached["dirs"]
+        except (OSError, ValueError):
+            pass
+
+    from importlib.metadata import entry_points
+
+    dirs = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        target = entry_point.load()
+        if callable(target):
+            target = target()
+        dirs.append(str(target))
+
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump({"signature": signature, "dirs": dirs}, f)
+        except OSError:
+            pass
+    return dirs
+
+
+def discover():
+    """All registered datasets, returns ([(kind, name, config), ...], [error, ...])"""
+    dirs = [d for d in os.environ.get(DATASETS_ENV, "").split(os.pathsep) if d]
+    errors = []
+    try:
+        dirs += entry_point_dirs()
+    except Exception as e:
+        errors.append(f"{ENTRY_POINT_GROUP} entry points: {e}")
+
+    datasets = []
+    for directory in dirs:
+        try:
+            datasets.extend(load_manifest(directory))
+        except DatasetError as e:
+            errors.append(str(e))
+    return datasets, errors
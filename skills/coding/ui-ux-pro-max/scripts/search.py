@@ -3,22 +3,47 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --stack all           # or --stack react,vue,svelte,flutter
+       python search.py "<query>" --domain ux --filter severity=high --filter platform=web
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
+Extra domains and stacks can be registered through UIPRO_DATASETS (see registry.py)
+
+Token budget:
+  --token-budget N     Pack the best results and fields into ~N LLM tokens,
+                       preferring fields that matched the query
+
+Explain:
+  --explain            Per result, per-term tf / idf / length norm contributions,
+                       plus documents scored vs skipped and per-phase timings
+
+Pagination:
+  --offset N           Skip the first N ranked results
+  --cursor TOKEN       Continue from a previous page (printed as next_cursor)
+  --jsonl              Stream JSON Lines: one metadata line, then one line per result
+
+Filters (categorical columns, AND across columns, comma = OR within one):
+  --filter COL=VALUE   e.g. dark_mode=yes, complexity=low,medium, severity=high
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Tracing:
+  --trace FILE Record per-stage timings (Chrome trace JSON, or JSONL if FILE ends in .jsonl)
+               Same as setting UIPRO_TRACE=FILE
 """
 
 import argparse
+import json
 import sys
 import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
+from core import CSV_CONFIG, AVAILABLE_STACKS, DATASET_ERRORS, MAX_RESULTS, SNIPPET_CHARS, search, search_stack, search_stacks
 from design_system import generate_design_system, persist_design_system
+import tracing
 
 # Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -27,6 +52,20 @@ if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
+def parse_filters(items):
+    """Turn ['severity=high', 'complexity=low,medium'] into a filters dict"""
+    filters = {}
+    for item in items or []:
+        if "=" not in item:
+            raise argparse.ArgumentTypeError(f"Invalid filter '{item}', expected COLUMN=VALUE")
+        column, value = item.split("=", 1)
+        values = [v.strip() for v in value.split(",") if v.strip()]
+        if not column.strip() or not values:
+            raise argparse.ArgumentTypeError(f"Invalid filter '{item}', expected COLUMN=VALUE")
+        filters.setdefault(column.strip(), []).extend(values)
+    return filters
+
+
 def format_output(result):
     """Format results for Claude consumption (token-optimized)"""
     if "error" in result:
@@ -39,27 +78,143 @@ def format_output(result):
     else:
         output.append(f"## UI Pro Max Search Results")
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+    shown = f"{result['count']} results"
+    if result.get("total", 0) > result["count"]:
+        shown += f" (of {result['total']})"
+    output.append(f"**Source:** {result['file']} | **Found:** {shown}\n")
+    if result.get("budget"):
+        output.append(_format_budget(result["budget"]))
+
+    _format_rows(result['results'], output, "###", result.get("snippets"), result.get("offset", 0))
+    if result.get("next_cursor"):
+        output.append(f"*More results: --cursor {result['next_cursor']} ({result['total']} total)*")
+    if result.get("explain"):
+        output.append("")
+        output.extend(_format_explain(result["explain"], result.get("offset", 0)))
+
+    return "\n".join(output)
+
+
+def _format_budget(budget):
+    """One-line summary of token-budget packing"""
+    return f"*Token budget: ~{budget['used']}/{budget['limit']} used, {budget['omitted_fields']} fields omitted*\n"
+
+
+def _format_explain(explain, start=0):
+    """Lines of the --explain report"""
+    stats = explain["stats"]
+    lines = ["### Explain"]
+    lines.append(f"**Terms:** {', '.join(explain['query_tokens']) or '(none)'} | "
+                 f"k1={explain['k1']} b={explain['b']} avgdl={explain['avgdl']:.1f}")
+    detail = [f"postings read {stats.get('postings_read', 0)}", f"filtered {stats.get('skipped_filtered', 0)}",
+              f"deleted {stats.get('skipped_deleted', 0)}"]
+    if stats.get("shards"):
+        detail.append(f"{stats['shards']} shards")
+    if stats.get("cached"):
+        detail.append("cached ranking")
+    lines.append(f"**Docs:** {stats['docs_scored']} scored / {stats['docs_skipped']} skipped of {stats['docs_total']} "
+                 f"({', '.join(detail)})")
+    lines.append("**Phases (ms):** " + " | ".join(f"{name} {ms:.3f}" for name, ms in explain.get("timings", {}).items()))
+    for i, doc in enumerate(explain["results"], start + 1):
+        terms = "; ".join(
+            f"{t['term']} tf={t['tf']} idf={t['idf']:.3f} norm={t['length_norm']:.3f} -> {t['contribution']:.3f}"
+            for t in doc["terms"] if t["tf"]
+        )
+        lines.append(f"- Result {i} (score {doc['score']:.3f}, length {doc['doc_length']}): {terms}")
+    return lines
+
+
+def _format_value(value, snippet):
+    """Long values show the best-matching window when there is one, else the head"""
+    value_str = str(value)
+    if len(value_str) <= SNIPPET_CHARS:
+        return value_str
+    if snippet:
+        prefix = "..." if snippet["start"] > 0 else ""
+        suffix = "..." if snippet["end"] < len(value_str) else ""
+        return prefix + snippet["text"] + suffix
+    return value_str[:SNIPPET_CHARS] + "..."
 
-    for i, row in enumerate(result['results'], 1):
-        output.append(f"### Result {i}")
+
+def _format_rows(rows, output, heading, snippets=None, start=0):
+    """Append numbered result blocks to output, numbering from start + 1"""
+    for i, row in enumerate(rows):
+        windows = snippets[i] if snippets else {}
+        output.append(f"{heading} Result {start + i + 1}")
         for key, value in row.items():
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
-            output.append(f"- **{key}:** {value_str}")
+            output.append(f"- **{key}:** {_format_value(value, windows.get(key))}")
         output.append("")
 
+
+def format_stacks_output(result):
+    """Format cross-stack results, one section per stack"""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    output = []
+    output.append(f"## UI Pro Max Cross-Stack Guidelines")
+    output.append(f"**Stacks:** {', '.join(result['stacks'])} | **Query:** {result['query']}")
+    output.append(f"**Found:** {result['count']} results\n")
+    if result.get("budget"):
+        output.append(_format_budget(result["budget"]))
+
+    for stack in result['stacks']:
+        rows = result['results'].get(stack, [])
+        output.append(f"### {stack} ({result['files'][stack]}, {len(rows)} results)")
+        _format_rows(rows, output, "####", result.get("snippets", {}).get(stack))
+
     return "\n".join(output)
 
 
+def print_jsonl(result):
+    """Stream a result as JSON Lines: metadata first, then one line per row.
+
+    Cross-stack rows carry a "stack" key. Lines are flushed as written so a
+    consumer can start on the first row before the page is complete.
+    """
+    rows = result.pop("results", [])
+    snippets = result.pop("snippets", None)
+    print(json.dumps(result, ensure_ascii=False), flush=True)
+    if isinstance(rows, dict):
+        for stack, stack_rows in rows.items():
+            _print_jsonl_rows(stack_rows, 0, (snippets or {}).get(stack), stack=stack)
+    else:
+        _print_jsonl_rows(rows, result.get("offset", 0), snippets)
+
+
+def _print_jsonl_rows(rows, start, snippets, **extra):
+    """One JSON line per row, ranked from start + 1"""
+    for i, row in enumerate(rows):
+        line = dict(extra, rank=start + i + 1, row=row)
+        if snippets:
+            line["snippets"] = snippets[i]
+        print(json.dumps(line, ensure_ascii=False), flush=True)
+
+
+def print_result(result, args, formatter):
+    """Print a search result as JSON, JSON Lines or text"""
+    if args.jsonl:
+        print_jsonl(result)
+    elif args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(formatter(result))
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
     parser.add_argument("query", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--stack", "-s", type=str, default=None, help="Stack-specific search: one stack, a comma list (react,vue) or 'all'")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--jsonl", action="store_true", help="Output as JSON Lines (metadata line, then one result per line)")
+    parser.add_argument("--offset", type=int, default=0, help="Skip the first N ranked results (default: 0)")
+    parser.add_argument("--cursor", type=str, default=None, help="Fetch the page after a previous result (its next_cursor)")
+    parser.add_argument("--token-budget", "-t", type=int, default=None, metavar="N", help="Fit output into ~N tokens, keeping the best results and matched fields")
+    parser.add_argument("--snippets", action="store_true", help="Include best-matching excerpts and highlight offsets in --json output")
+    parser.add_argument("--explain", action="store_true", help="Show per-term score contributions, docs scored vs skipped and phase timings")
+    parser.add_argument("--filter", "-F", action="append", metavar="COL=VALUE", help="Filter on a categorical column (repeatable), e.g. severity=high")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -68,9 +223,38 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Tracing
+    parser.add_argument("--trace", type=str, default=None, help="Write per-stage timings to FILE (Chrome trace, or JSONL for *.jsonl)")
 
     args = parser.parse_args()
 
+    if args.trace:
+        tracing.enable(args.trace)
+
+    for error in DATASET_ERRORS:
+        print(f"Warning: skipped registered datasets: {error}", file=sys.stderr)
+
+    try:
+        filters = parse_filters(args.filter)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    # Text output always trims long fields to their best-matching window
+    snippets = args.snippets or not (args.json or args.jsonl)
+    if args.offset < 0:
+        parser.error("argument --offset: must be >= 0")
+    if args.max_results < 1:
+        parser.error("argument --max-results/-n: must be >= 1")
+    if args.token_budget is not None and args.token_budget < 1:
+        parser.error("argument --token-budget/-t: must be >= 1")
+
+    stacks = None
+    if args.stack:
+        stacks = AVAILABLE_STACKS if args.stack == "all" else [s.strip() for s in args.stack.split(",") if s.strip()]
+        unknown = [s for s in stacks if s not in AVAILABLE_STACKS]
+        if unknown:
+            parser.error(f"argument --stack/-s: invalid choice: {', '.join(unknown)} (choose from {', '.join(AVAILABLE_STACKS)}, all)")
+
     # Design system takes priority
     if args.design_system:
         result = generate_design_system(
@@ -96,19 +280,19 @@ if __name__ == "__main__":
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
+    # Cross-stack search
+    elif stacks and (len(stacks) > 1 or args.stack == "all"):
+        if args.offset or args.cursor or args.explain:
+            parser.error("--offset/--cursor/--explain apply to a single domain or stack, not a cross-stack search")
+        result = search_stacks(args.query, stacks, args.max_results, filters, snippets, args.token_budget)
+        print_result(result, args, format_stacks_output)
     # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+    elif stacks:
+        result = search_stack(args.query, stacks[0], args.max_results, filters, snippets, args.token_budget,
+                              args.offset, args.cursor, args.explain)
+        print_result(result, args, format_output)
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+        result = search(args.query, args.domain, args.max_results, filters, snippets, args.token_budget,
+                        args.offset, args.cursor, args.explain)
+        print_result(result, args, format_output)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Shards - Multi-process scatter-gather scoring for large indexes
+
+A SearchIndex snapshot is split round-robin into shards. Each shard's postings,
+document lengths and tie-break positions are flat int32 arrays in one
+multiprocessing.shared_memory block, so worker processes score them in place
+instead of receiving a copy. The parent sends every shard the same global
+statistics (idf per term, avgdl, k1, b), which keeps scores bit-identical to
+SearchIndex.score_tokens, and merges the per-shard top-k lists.
+
+Used by core.SearchIndex once an index holds SHARD_MIN_DOCS documents and
+UIPRO_WORKERS (default: CPU count) is above 1.
+"""
+
+import atexit
+import heapq
+import multiprocessing
+import os
+import pickle
+import struct
+import weakref
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+WORKERS_ENV = "UIPRO_WORKERS"
+_ITEM = array("i").itemsize
+_HEADER = struct.Struct("<Q")
+_ATTACHED_LIMIT = 32
+# Forked workers share the parent's resource tracker; spawned ones start their own
+_START_METHOD = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_workers = 0
+_scorers = weakref.WeakSet()
+
+
+def default_workers():
+    """Worker processes for sharded scoring (UIPRO_WORKERS, else CPU count)"""
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        return max(1, int(value))
+    return os.cpu_count() or 1
+
+
+def _get_pool(workers):
+    """Process pool shared by every sharded index in this process"""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD))
+        _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def _shutdown():
+    """Stop the workers and unlink every block still owned by this process"""
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    for scorer in list(_scorers):
+        scorer.close()
+
+
+def _hit_order(hit):
+    """(score, position, doc_id) -> best score first, then source order"""
+    return -hit[0], hit[1]
+
+
+# ============ SHARED MEMORY LAYOUT ============
+# [u64 meta length][pickled meta][pad to 8] then int32 arrays:
+# postings doc (local), postings tf, length, global doc id, position
+def _write_shard(terms, docs, tfs, lengths, doc_ids, positions):
+    """Copy one shard into a new shared memory block, returns the block"""
+    meta = pickle.dumps({"terms": terms, "postings": len(docs), "docs": len(lengths)}, protocol=pickle.HIGHEST_PROTOCOL)
+    start = (_HEADER.size + len(meta) + 7) // 8 * 8
+    arrays = [array("i", values) for values in (docs, tfs, lengths, doc_ids, positions)]
+    size = start + sum(len(a) * _ITEM for a in arrays)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _HEADER.pack_into(shm.buf, 0, len(meta))
+    shm.buf[_HEADER.size:_HEADER.size + len(meta)] = meta
+    offset = start
+    for a in arrays:
+        nbytes = len(a) * _ITEM
+        shm.buf[offset:offset + nbytes] = a.tobytes()
+        offset += nbytes
+    return shm
+
+
+def _read_shard(buf):
+    """(terms, docs, tfs, lengths, doc_ids, positions) views over a shard block"""
+    (meta_len,) = _HEADER.unpack_from(buf, 0)
+    meta = pickle.loads(buf[_HEADER.size:_HEADER.size + meta_len])
+    offset = (_HEADER.size + meta_len + 7) // 8 * 8
+    views = []
+    for count in (meta["postings"], meta["postings"], meta["docs"], meta["docs"], meta["docs"]):
+        views.append(buf[offset:offset + count * _ITEM].cast("i"))
+        offset += count * _ITEM
+    return (meta["terms"], *views)
+
+
+# ============ WORKER ============
+_attached = OrderedDict()  # block name -> (SharedMemory, shard views), per worker process
+
+
+def _attach(name):
+    """Map a shard block once per worker; old mappings are closed LRU-style"""
+    shard = _attached.get(name)
+    if shard is not None:
+        _attached.move_to_end(name)
+        return shard[1]
+    shm = shared_memory.SharedMemory(name=name)
+    if _START_METHOD != "fork":
+        # The parent owns the block; keep this worker's own tracker from unlinking it
+        resource_tracker.unregister(shm._name, "shared_memory")
+    views = _read_shard(shm.buf)
+    _attached[name] = (shm, views)
+    while len(_attached) > _ATTACHED_LIMIT:
+        _, (old, old_views) = _attached.popitem(last=False)
+        for view in old_views[1:]:
+            view.release()
+        old.close()
+    return views
+
+
+def score_shard(name, query, k1, b, avgdl, allowed, limit):
+    """Score one shard: (hits, [(score, position, doc_id), ...] best first, counters).
+
+    query is [(term, idf), ...] in query order; allowed is a little-endian
+    doc id bitmap (bytes) or None; limit caps the returned list (None = all).
+    """
+    terms, docs, tfs, lengths, doc_ids, positions = _attach(name)
+    scores = {}
+    postings_read = skipped_filtered = 0
+    for term, idf in query:
+        entry = terms.get(term)
+        if entry is None:
+            continue
+        start, count = entry
+        postings_read += count
+        for j in range(start, start + count):
+            local = docs[j]
+            if allowed is not None:
+                doc_id = doc_ids[local]
+                byte = doc_id >> 3
+                if byte >= len(allowed) or not (allowed[byte] >> (doc_id & 7)) & 1:
+                    skipped_filtered += 1
+                    continue
+            tf = tfs[j]
+            numerator = tf * (k1 + 1)
+            denominator = tf + k1 * (1 - b + b * lengths[local] / avgdl)
+            scores[local] = scores.get(local, 0.0) + idf * numerator / denominator
+
+    hits = [(score, positions[local], doc_ids[local]) for local, score in scores.items() if score > 0]
+    counters = {"postings_read": postings_read, "skipped_filtered": skipped_filtered}
+    if limit is not None and limit < len(hits):
+        return len(hits), heapq.nsmallest(limit, hits, key=_hit_order), counters
+    hits.sort(key=_hit_order)
+    return len(hits), hits, counters
+
+
+# ============ PARENT ============
+class ShardedScorer:
+    """Read-only shard snapshot of a SearchIndex, scored by the worker pool"""
+
+    def __init__(self, index, shards=None, workers=None):
+        self.workers = workers or default_workers()
+        self.k1 = index.k1
+        self.b = index.b
+        self.avgdl = index.avgdl
+        self.blocks = []
+
+        live = sorted(index.keys)
+        shard_count = max(1, min(shards or self.workers, len(live)))
+        owner = {doc_id: (i % shard_count, i // shard_count) for i, doc_id in enumerate(live)}
+        postings = [{} for _ in range(shard_count)]
+        lengths = [[0] * len(range(s, len(live), shard_count)) for s in range(shard_count)]
+        for segment in index.segments:
+            for term, term_postings in segment.postings.items():
+                for doc_id, tf in term_postings.items():
+                    if doc_id in segment.deleted:
+                        continue
+                    shard, local = owner[doc_id]
+                    postings[shard].setdefault(term, []).append((local, tf))
+            for doc_id, length in segment.lengths.items():
+                if doc_id not in segment.deleted:
+                    shard, local = owner[doc_id]
+                    lengths[shard][local] = length
+
+        for shard in range(shard_count):
+            terms = {}
+            docs = []
+            tfs = []
+            for term, entries in postings[shard].items():
+                terms[term] = (len(docs), len(entries))
+                for local, tf in entries:
+                    docs.append(local)
+                    tfs.append(tf)
+            members = live[shard::shard_count]
+            self.blocks.append(_write_shard(terms, docs, tfs, lengths[shard], members,
+                                            [index.positions[doc_id] for doc_id in members]))
+        _scorers.add(self)
+
+    def ranked(self, query, allowed=None, limit=None):
+        """Scatter query ([(term, idf), ...]) to every shard and merge the top-k.
+
+        allowed is an int doc id bitmap or None. Returns ([(doc_id, score), ...],
+        total hits, summed worker counters).
+        """
+        allowed_bytes = None
+        if allowed is not None:
+            allowed_bytes = allowed.to_bytes((allowed.bit_length() + 7) // 8, "little")
+        pool = _get_pool(self.workers)
+        futures = [pool.submit(score_shard, shm.name, query, self.k1, self.b, self.avgdl, allowed_bytes, limit)
+                   for shm in self.blocks]
+        total = 0
+        parts = []
+        counters = {}
+        for future in futures:
+            hits, top, shard_counters = future.result()
+            total += hits
+            parts.append(top)
+            for name, value in shard_counters.items():
+                counters[name] = counters.get(name, 0) + value
+        merged = heapq.merge(*parts, key=_hit_order)
+        ranking = []
+        for score, _, doc_id in merged:
+            if limit is not None and len(ranking) >= limit:
+                break
+            ranking.append((doc_id, score))
+        return ranking, total, counters
+
+    def close(self):
+        """Release the shared memory blocks"""
+        for shm in self.blocks:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
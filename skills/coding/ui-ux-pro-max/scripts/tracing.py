@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Tracing - Opt-in span recorder for search and design-system runs
+
+Enable with the UIPRO_TRACE=<file> environment variable or `search.py --trace <file>`.
+Files ending in .jsonl get one span per line; anything else is written as a
+Chrome trace (open in chrome://tracing or https://ui.perfetto.dev).
+
+Usage:
+    from tracing import span
+    with span("score", query=query):
+        ...
+
+capture() collects the spans of one block in memory, even with tracing off
+(used by search --explain for phase timings). Captures are per context, so
+concurrent searches on other threads or tasks never see each other's spans.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_ENV = "UIPRO_TRACE"
+
+_output = None
+_spans = []
+_captures = contextvars.ContextVar("uipro_captures", default=())  # event lists of this context's capture() blocks
+_lock = threading.Lock()
+_registered = False
+
+
+class _NullSpan:
+    """Shared no-op context used while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Records one complete ("X") event on exit"""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        event = {
+            "name": self.name,
+            "cat": "uipro",
+            "ph": "X",
+            "ts": self.start / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self.args:
+            event["args"] = self.args
+        if _output is not None:
+            with _lock:
+                _spans.append(event)
+        for events in _captures.get():
+            events.append(event)
+        return False
+
+
+def span(name, **args):
+    """Time a stage; free when tracing is disabled"""
+    if _output is None and not _captures.get():
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def enabled():
+    """True when spans are being recorded"""
+    return _output is not None
+
+
+@contextmanager
+def capture():
+    """Collect the events of spans that finish inside the block"""
+    events = []
+    token = _captures.set(_captures.get() + (events,))
+    try:
+        yield events
+    finally:
+        _captures.reset(token)
+
+
+def enable(path):
+    """Start recording spans, written to path at exit (or on flush())"""
+    global _output, _registered
+    _output = str(path)
+    if not _registered:
+        atexit.register(flush)
+        _registered = True
+
+
+def flush():
+    """Write recorded spans to the trace file"""
+    if _output is None:
+        return
+    with _lock:
+        events = list(_spans)
+    if _output.endswith(".jsonl"):
+        with open(_output, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    else:
+        with open(_output, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV])